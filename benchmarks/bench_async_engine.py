@@ -0,0 +1,74 @@
+"""
+Put-to-handler latency and context switches of EventEngine versus
+AsyncEventEngine.
+
+Events are put from another thread every --gap seconds (like websocket
+and REST threads do), while 100 ms and 50 ms call_every timers run too.
+Context switches are voluntary and involuntary ones of whole process,
+from getrusage.
+"""
+
+import resource
+import time
+from threading import Event as Flag
+
+from common import get_parser
+
+from vnpy.event import AsyncEventEngine, Event, EventEngine
+
+EVENT_TYPE = "eTick."
+
+
+def run(engine_class, count: int, gap: float):
+    """
+    Return sorted put-to-handler latencies in seconds, and voluntary
+    and involuntary context switches during run.
+    """
+    event_engine = engine_class(interval=1)
+    done = Flag()
+    latencies = []
+
+    def handler(event):
+        latencies.append(time.perf_counter() - event.data)
+        if len(latencies) == count:
+            done.set()
+
+    event_engine.register(EVENT_TYPE, handler)
+    event_engine.call_every(0.1, lambda: None)
+    event_engine.call_every(0.05, lambda: None)
+    event_engine.start()
+
+    before = resource.getrusage(resource.RUSAGE_SELF)
+    for i in range(count):
+        event_engine.put(Event(EVENT_TYPE, time.perf_counter()))
+        time.sleep(gap)
+    done.wait()
+    after = resource.getrusage(resource.RUSAGE_SELF)
+
+    event_engine.stop()
+
+    latencies.sort()
+    voluntary = after.ru_nvcsw - before.ru_nvcsw
+    involuntary = after.ru_nivcsw - before.ru_nivcsw
+    return latencies, voluntary, involuntary
+
+
+def main():
+    """"""
+    parser = get_parser(__doc__, baseline=False)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--gap", type=float, default=0.0002)
+    args = parser.parse_args()
+
+    for engine_class in [EventEngine, AsyncEventEngine]:
+        latencies, voluntary, involuntary = run(engine_class, args.count, args.gap)
+        p50 = latencies[len(latencies) // 2] * 1_000_000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1_000_000
+        print(
+            f"{engine_class.__name__:<20}p50 {p50:>7.1f} us    p99 {p99:>7.1f} us    "
+            f"switches {voluntary} voluntary, {involuntary} involuntary"
+        )
+
+
+if __name__ == "__main__":
+    main()
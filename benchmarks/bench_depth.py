@@ -0,0 +1,88 @@
+"""
+Cost of FmexWebsocketApi.on_depth per depth.L20 message, from decoded
+message to tick pushed (order book update included), and memory
+allocated per message.
+
+Compare with gateway before array-backed DepthTickData:
+
+    python benchmarks/bench_depth.py --baseline 97df3bf~1
+"""
+
+import time
+import tracemalloc
+
+from common import get_frames_by_topic, get_parser, load_frames, load_revision, report
+
+from vnpy.api.decoder import decode
+from vnpy.event import EventEngine
+from vnpy.gateway.fmex import fmex_gateway
+from vnpy.trader.constant import Exchange
+from vnpy.trader.object import SubscribeRequest
+
+
+def create_gateway(module):
+    """"""
+    gateway = module.FmexGateway(EventEngine())
+    gateway.subscribe(SubscribeRequest("BTCUSD_P", Exchange.FMEX))
+    gateway.on_tick = lambda tick: None
+    return gateway
+
+
+def create_messages(frames: list, count: int, start: int):
+    """
+    Decode count messages from frames, with increasing timestamps so
+    that none is dropped as duplicate.
+    """
+    messages = []
+    for i in range(count):
+        d = decode(frames[i % len(frames)])
+        d["ts"] = start + i
+        messages.append(d)
+    return messages
+
+
+def run(module, frames: list, count: int):
+    """
+    Return seconds of count messages and peak bytes of one message.
+    """
+    gateway = create_gateway(module)
+    on_depth = gateway.ws_api.on_depth
+
+    messages = create_messages(frames, count, 1)
+    start = time.perf_counter()
+    for d in messages:
+        on_depth(d)
+    seconds = time.perf_counter() - start
+
+    d = create_messages(frames, 1, count + 1)[0]
+    tracemalloc.start()
+    on_depth(d)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return seconds, peak
+
+
+def main():
+    """"""
+    parser = get_parser(__doc__)
+    parser.add_argument("--count", type=int, default=50_000)
+    args = parser.parse_args()
+
+    frames = get_frames_by_topic(load_frames())["depth"]
+
+    modules = [("current", fmex_gateway)]
+    if args.baseline:
+        baseline = load_revision(
+            args.baseline, "vnpy/gateway/fmex/fmex_gateway.py", "baseline_gateway"
+        )
+        modules.insert(0, (args.baseline, baseline))
+
+    for label, module in modules:
+        seconds, peak = run(module, frames, args.count)
+        report(label, seconds, args.count)
+        print(f"{'':<32}{peak:>10} peak bytes/msg")
+
+
+if __name__ == "__main__":
+    main()
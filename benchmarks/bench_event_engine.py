@@ -0,0 +1,64 @@
+"""
+Throughput of EventEngine dispatch: a producer puts events of one type
+while the dispatcher runs two handlers for it.
+
+Compare with the engine before batch draining and handler tables:
+
+    python benchmarks/bench_event_engine.py --baseline d796da6~1
+"""
+
+import time
+from threading import Event as Flag
+
+from common import get_parser, load_revision, report
+
+from vnpy.event import engine
+
+EVENT_TYPE = "eTick."
+
+
+def run(module, count: int):
+    """
+    Put count events and wait till all are handled.
+    """
+    event_engine = module.EventEngine(interval=1)
+    done = Flag()
+    handled = [0]
+
+    def handler(event):
+        handled[0] += 1
+        if handled[0] == count:
+            done.set()
+
+    event_engine.register(EVENT_TYPE, handler)
+    event_engine.register(EVENT_TYPE, lambda event: None)
+    event_engine.start()
+
+    Event = module.Event
+    start = time.perf_counter()
+    for i in range(count):
+        event_engine.put(Event(EVENT_TYPE, i))
+    done.wait()
+    seconds = time.perf_counter() - start
+
+    event_engine.stop()
+    return seconds
+
+
+def main():
+    """"""
+    parser = get_parser(__doc__)
+    parser.add_argument("--count", type=int, default=300_000)
+    args = parser.parse_args()
+
+    modules = [("current", engine)]
+    if args.baseline:
+        baseline = load_revision(args.baseline, "vnpy/event/engine.py", "baseline_engine")
+        modules.insert(0, (args.baseline, baseline))
+
+    for label, module in modules:
+        report(label, run(module, args.count), args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Decode time of FMEX websocket frames with each installed JSON backend.
+
+Frames are read from a recording with one frame per line, by default
+benchmarks/data/fmex_frames.jsonl (depth.L20, ticker and trade frames of
+btcusd_p in FMEX v2 websocket format). Pass --frames to use another
+recording.
+"""
+
+import importlib
+import time
+
+from common import DATA_PATH, get_frames_by_topic, get_parser, load_frames, report
+
+from vnpy.api import decoder
+
+BACKENDS = ["json", "ujson", "orjson"]
+
+
+def main():
+    """"""
+    parser = get_parser(__doc__, baseline=False)
+    parser.add_argument("--frames", default=DATA_PATH)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    topics = get_frames_by_topic(load_frames(args.frames))
+    print(f"decoder.decode uses {decoder.BACKEND}")
+
+    for name in BACKENDS:
+        try:
+            loads = importlib.import_module(name).loads
+        except ImportError:
+            print(f"{name} not installed")
+            continue
+
+        for topic, frames in topics.items():
+            start = time.perf_counter()
+            for i in range(args.rounds):
+                for frame in frames:
+                    loads(frame)
+            seconds = time.perf_counter() - start
+
+            size = sum(len(frame) for frame in frames) // len(frames)
+            report(f"{name} {topic} ({size} B)", seconds, args.rounds * len(frames))
+
+
+if __name__ == "__main__":
+    main()
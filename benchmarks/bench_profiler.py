@@ -0,0 +1,66 @@
+"""
+Dispatch cost of EventEngine with handler profiling disabled and enabled.
+
+A producer puts events of one type while the dispatcher runs two
+handlers for it, as in bench_event_engine.py.
+"""
+
+import time
+from threading import Event as Flag
+
+from common import get_parser, report
+
+from vnpy.event import Event, EventEngine
+
+EVENT_TYPE = "eTick."
+
+
+def run(count: int, sample_every: int = 0):
+    """
+    Put count events and wait till all are handled, with profiling
+    enabled if sample_every is given.
+    """
+    event_engine = EventEngine(interval=1)
+    done = Flag()
+    handled = [0]
+
+    def handler(event):
+        handled[0] += 1
+        if handled[0] == count:
+            done.set()
+
+    event_engine.register(EVENT_TYPE, handler)
+    event_engine.register(EVENT_TYPE, lambda event: None)
+    if sample_every:
+        event_engine.enable_profiling(sample_every, summary_interval=0)
+    event_engine.start()
+
+    start = time.perf_counter()
+    for i in range(count):
+        event_engine.put(Event(EVENT_TYPE, i))
+    done.wait()
+    seconds = time.perf_counter() - start
+
+    event_engine.stop()
+    return seconds, event_engine.get_profile()
+
+
+def main():
+    """"""
+    parser = get_parser(__doc__, baseline=False)
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--sample-every", type=int, default=16)
+    args = parser.parse_args()
+
+    seconds, _ = run(args.count)
+    report("profiling off", seconds, args.count)
+
+    seconds, profile = run(args.count, args.sample_every)
+    report(f"profiling on (1/{args.sample_every})", seconds, args.count)
+
+    wait = profile["queue_wait"]
+    print(f"queue wait p50 {wait['p50']:.1f} us, p99 {wait['p99']:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Cost of signing FMEX REST requests, on a mix of 2 limit orders, 1 cancel
+and 1 open order query per round.
+
+With --baseline, signatures of both revisions are first checked to be
+identical with a fixed timestamp, e.g.:
+
+    python benchmarks/bench_sign.py --baseline 3aa7aff~1
+"""
+
+import json
+import time
+
+from common import get_parser, load_revision, report
+
+from vnpy.api.rest import Request
+from vnpy.event import EventEngine
+from vnpy.gateway.fmex import fmex_gateway
+
+KEY = "7ac0a2b1e4d24f0c9a7e"
+SECRET = "3f9a1b2c4d5e6f708192a3b4c5d6e7f8"
+
+
+def create_rest_api(module):
+    """"""
+    gateway = module.FmexGateway(EventEngine())
+    rest_api = gateway.rest_api
+    rest_api.key = KEY
+    rest_api.secret = SECRET
+    rest_api.init(module.REST_HOST)
+    if hasattr(rest_api, "prepare_sign"):
+        rest_api.prepare_sign()
+    return rest_api
+
+
+def create_requests():
+    """"""
+    return [
+        Request("POST", "/v3/contracts/orders", None, {
+            "symbol": "BTCUSD_P",
+            "direction": "LONG",
+            "type": "LIMIT",
+            "quantity": 900,
+            "price": 9123.5,
+        }, None),
+        Request("POST", "/v3/contracts/orders/123456789/cancel", None, None, None),
+        Request("POST", "/v3/contracts/orders", None, {
+            "symbol": "BTCUSD_P",
+            "direction": "SHORT",
+            "type": "LIMIT",
+            "quantity": 900,
+            "price": 9150.0,
+        }, None),
+        Request("GET", "/v3/contracts/orders/open", {"symbol": "btcusd_p"}, None, None),
+    ]
+
+
+def check_identical(old_api, new_api):
+    """
+    Compare headers and body signed by both with a fixed timestamp.
+    """
+    real_time = time.time
+    time.time = lambda: 1571234567.891
+    try:
+        for old, new in zip(create_requests(), create_requests()):
+            old = old_api.sign(old)
+            new = new_api.sign(new)
+            assert old.headers == new.headers, (old.headers, new.headers)
+            assert json.loads(old.data or "null") == json.loads(new.data or "null")
+    finally:
+        time.time = real_time
+
+    print("signatures identical")
+
+
+def run(rest_api, rounds: int):
+    """"""
+    batches = [create_requests() for i in range(rounds)]
+
+    sign = rest_api.sign
+    start = time.perf_counter()
+    for batch in batches:
+        for request in batch:
+            sign(request)
+    return time.perf_counter() - start
+
+
+def main():
+    """"""
+    parser = get_parser(__doc__)
+    parser.add_argument("--rounds", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rest_api = create_rest_api(fmex_gateway)
+    count = args.rounds * 4
+
+    if args.baseline:
+        baseline = load_revision(
+            args.baseline, "vnpy/gateway/fmex/fmex_gateway.py", "baseline_gateway"
+        )
+        baseline_api = create_rest_api(baseline)
+        check_identical(baseline_api, rest_api)
+        report(args.baseline, run(baseline_api, args.rounds), count)
+
+    report("current", run(rest_api, args.rounds), count)
+
+
+if __name__ == "__main__":
+    main()
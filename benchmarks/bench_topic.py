@@ -0,0 +1,73 @@
+"""
+Cost of publishing a tick to type and per-symbol subscribers.
+
+Before topic routing, gateway put two events per update (EVENT_TICK and
+EVENT_TICK + vt_symbol). Now it puts one event with vt_symbol as topic.
+Both ways are run on current engine, and the two event way also on the
+engine of --baseline, e.g.:
+
+    python benchmarks/bench_topic.py --baseline c3aad61~1
+"""
+
+import time
+from threading import Event as Flag
+
+from common import get_parser, load_revision, report
+
+from vnpy.event import engine
+
+EVENT_TICK = "eTick."
+VT_SYMBOL = "BTCUSD_P.FMEX"
+
+
+def run(module, count: int, topic: bool):
+    """
+    Publish count updates with a type handler and a general handler
+    registered, and wait till all are handled.
+    """
+    event_engine = module.EventEngine(interval=1)
+    done = Flag()
+    handled = [0]
+
+    def handler(event):
+        handled[0] += 1
+        if handled[0] == count:
+            done.set()
+
+    event_engine.register(EVENT_TICK, handler)
+    event_engine.register_general(lambda event: None)
+    event_engine.start()
+
+    Event = module.Event
+    put = event_engine.put
+    start = time.perf_counter()
+    if topic:
+        for i in range(count):
+            put(Event(EVENT_TICK, i, VT_SYMBOL))
+    else:
+        for i in range(count):
+            put(Event(EVENT_TICK, i))
+            put(Event(EVENT_TICK + VT_SYMBOL, i))
+    done.wait()
+    seconds = time.perf_counter() - start
+
+    event_engine.stop()
+    return seconds
+
+
+def main():
+    """"""
+    parser = get_parser(__doc__)
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args()
+
+    if args.baseline:
+        baseline = load_revision(args.baseline, "vnpy/event/engine.py", "baseline_engine")
+        report(f"{args.baseline} two events", run(baseline, args.count, False), args.count)
+
+    report("current two events", run(engine, args.count, False), args.count)
+    report("current one event with topic", run(engine, args.count, True), args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Helpers shared by benchmark scripts.
+
+Scripts are run from repository root, e.g.:
+
+    python benchmarks/bench_parse.py
+
+Most scripts accept --baseline REV to also measure the code of a git
+revision, loaded from git without checking it out.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(ROOT, "benchmarks", "data", "fmex_frames.jsonl")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def get_parser(description: str, baseline: bool = True):
+    """"""
+    parser = argparse.ArgumentParser(description=description)
+    if baseline:
+        parser.add_argument(
+            "--baseline",
+            default="",
+            help="git revision to compare with, e.g. HEAD~1"
+        )
+    return parser
+
+
+def load_revision(rev: str, path: str, name: str):
+    """
+    Load a module of repository from git revision rev. Imports inside
+    the module (relative ones too) are resolved against current tree.
+    """
+    source = subprocess.check_output(
+        ["git", "show", f"{rev}:{path}"], cwd=ROOT
+    ).decode()
+
+    module = types.ModuleType(name)
+    module.__file__ = f"{rev}:{path}"
+    module.__package__ = os.path.dirname(path).replace("/", ".")
+    sys.modules[name] = module
+    exec(compile(source, module.__file__, "exec"), module.__dict__)
+    return module
+
+
+def load_frames(path: str = DATA_PATH):
+    """
+    Load websocket frames recorded as one JSON text per line.
+    """
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def get_frames_by_topic(frames: list):
+    """
+    Group frames by topic prefix (depth, ticker, trade).
+    """
+    topics = {}
+    for frame in frames:
+        prefix = json.loads(frame)["type"].split(".")[0]
+        topics.setdefault(prefix, []).append(frame)
+    return topics
+
+
+def report(label: str, seconds: float, count: int):
+    """
+    Print time per operation in microseconds.
+    """
+    print(f"{label:<32}{seconds / count * 1_000_000:>10.2f} us/op    {count / seconds:>12,.0f} op/s")
@@ -1,7 +1,8 @@
 # encoding: UTF-8
-from vnpy.event import EventEngine
+from vnpy.event import EventEngine, OverloadPolicy
 
 from vnpy.trader.engine import MainEngine
+from vnpy.trader.event import EVENT_TICK, EVENT_ORDERS, EVENT_LOG
 
 from vnpy.gateway.fmex import FmexGateway
 
@@ -13,7 +14,11 @@ from vnpy.trader.vtFunction import loadJsonSetting
 def main():
     """"""
 
-    event_engine = EventEngine()
+    # Only the latest depth snapshot of each symbol is needed for quoting.
+    event_engine = EventEngine(conflate_types=[EVENT_TICK])
+    # Stale open order snapshots and logs are dropped when falling behind.
+    event_engine.set_capacity(EVENT_ORDERS, 2, OverloadPolicy.DROP_OLDEST)
+    event_engine.set_capacity(EVENT_LOG, 10000, OverloadPolicy.DROP_OLDEST)
 
     main_engine = MainEngine(event_engine)
     main_engine.add_gateway(FmexGateway)
@@ -41,7 +46,7 @@ def main():
     app_setting = {"template_name": 'MinerAlgo',
         "vt_symbol": symbol + "." + gateway_name,
         "volume": 900,                  #一笔挂单量，单位USD
-        "interval":2,                   #每隔多少秒循环一次挂单函数
+        "interval":2,                   #每隔多少秒循环一次挂单函数，支持小数如0.25
         "minimum_distance": 40,         #离盘口的最小距离，单位USD
         "guadan_max_count": 15,         #单方向挂单最大数量
         "algo_name":'FCOIN_Miner_guadan'
@@ -0,0 +1,170 @@
+"""
+Local stand-in of FMEX websocket server for tests.
+
+Speaks just enough of RFC 6455 (handshake, unfragmented text frames,
+close) to serve one client at a time. It greets each connection with
+hello, verifies auth commands with the same HMAC scheme as the gateway,
+records every command received and lets tests push packets.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import socket
+import struct
+from queue import Empty, Queue
+from threading import Thread
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class FmexStandInServer:
+    """"""
+
+    def __init__(self, key: str, secret: str):
+        """"""
+        self.key = key
+        self.secret = secret.encode()
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(1)
+
+        self.port = self.sock.getsockname()[1]
+        self.url = f"ws://127.0.0.1:{self.port}/v2/ws"
+
+        self.conn = None
+        self.commands = Queue()
+        self.active = True
+        self.thread = Thread(target=self.run, daemon=True)
+
+    def start(self):
+        """"""
+        self.thread.start()
+
+    def stop(self):
+        """"""
+        self.active = False
+        if self.conn:
+            self.conn.close()
+        self.sock.close()
+
+    def run(self):
+        """"""
+        while self.active:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+
+            self.conn = conn
+            try:
+                self.handshake(conn)
+                self.push({"type": "hello", "ts": 0})
+
+                while self.active:
+                    text = self.recv_text(conn)
+                    if text is None:
+                        break
+                    self.on_command(json.loads(text))
+            except OSError:
+                pass
+            conn.close()
+
+    def handshake(self, conn: socket.socket):
+        """"""
+        data = b""
+        while b"\r\n\r\n" not in data:
+            data += conn.recv(4096)
+
+        headers = {}
+        for line in data.decode().split("\r\n")[1:]:
+            if ":" in line:
+                k, v = line.split(":", 1)
+                headers[k.strip().lower()] = v.strip()
+
+        accept = base64.b64encode(
+            hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest()
+        ).decode()
+
+        conn.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+
+    def recv_exact(self, conn: socket.socket, n: int):
+        """"""
+        data = b""
+        while len(data) < n:
+            chunk = conn.recv(n - len(data))
+            if not chunk:
+                raise OSError("connection closed")
+            data += chunk
+        return data
+
+    def recv_text(self, conn: socket.socket):
+        """
+        Receive a masked client frame, return None on close frame.
+        """
+        head = self.recv_exact(conn, 2)
+        opcode = head[0] & 0x0F
+        length = head[1] & 0x7F
+
+        if length == 126:
+            length = struct.unpack(">H", self.recv_exact(conn, 2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", self.recv_exact(conn, 8))[0]
+
+        mask = self.recv_exact(conn, 4)
+        payload = self.recv_exact(conn, length)
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+        if opcode == 0x8:
+            return None
+        return payload.decode()
+
+    def push(self, packet: dict):
+        """
+        Send a packet to connected client as unmasked text frame.
+        """
+        payload = json.dumps(packet).encode()
+        length = len(payload)
+
+        if length < 126:
+            head = struct.pack(">BB", 0x81, length)
+        elif length < 65536:
+            head = struct.pack(">BBH", 0x81, 126, length)
+        else:
+            head = struct.pack(">BBQ", 0x81, 127, length)
+
+        self.conn.sendall(head + payload)
+
+    def on_command(self, cmd: dict):
+        """"""
+        self.commands.put(cmd)
+
+        if cmd.get("cmd") == "auth":
+            key, timestamp, signature = cmd["args"]
+            msg = base64.b64encode(("GET" + self.url + timestamp).encode())
+            expected = base64.b64encode(
+                hmac.new(self.secret, msg, digestmod=hashlib.sha1).digest()
+            ).decode()
+
+            status = 0 if key == self.key and signature == expected else 1
+            self.push({"type": "auth", "id": cmd.get("id"), "status": status})
+
+    def wait_command(self, name: str, timeout: float = 5):
+        """
+        Wait for a command of name sent by client.
+        """
+        while True:
+            try:
+                cmd = self.commands.get(timeout=timeout)
+            except Empty:
+                return None
+            if cmd.get("cmd") == name:
+                return cmd
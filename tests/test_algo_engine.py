@@ -0,0 +1,105 @@
+"""
+Miner AlgoEngine quoting with FmexGateway, on both event engines.
+"""
+
+import time
+import unittest
+
+from vnpy.app.fmex_miner_guadan import AlgoTradingApp
+from vnpy.app.fmex_miner_guadan.engine import APP_NAME
+from vnpy.event import AsyncEventEngine, EventEngine
+from vnpy.gateway.fmex import FmexGateway
+from vnpy.trader.constant import Direction, Exchange, Product
+from vnpy.trader.engine import MainEngine
+from vnpy.trader.object import ContractData, SubscribeRequest
+
+SYMBOL = "BTCUSD_P"
+MAX_COUNT = 3
+
+
+class AlgoEngineTest(unittest.TestCase):
+    """"""
+
+    engine_class = EventEngine
+
+    def setUp(self):
+        """"""
+        self.event_engine = self.engine_class(interval=0)
+        self.main_engine = MainEngine(self.event_engine)
+
+        self.gateway = self.main_engine.add_gateway(FmexGateway)
+        self.gateway.ws_api.send_packet = lambda packet: None
+        self.requests = []
+        self.gateway.send_order = self.send_order
+
+        self.gateway.subscribe(SubscribeRequest(SYMBOL, Exchange.FMEX))
+        self.gateway.on_contract(ContractData(
+            symbol=SYMBOL,
+            exchange=Exchange.FMEX,
+            name=SYMBOL,
+            product=Product.FUTURES,
+            size=1,
+            pricetick=0.5,
+            gateway_name=self.gateway.gateway_name,
+        ))
+
+        # Contract event is processed by dispatch thread.
+        deadline = time.time() + 5
+        while not self.main_engine.get_contract(f"{SYMBOL}.{Exchange.FMEX.value}"):
+            if time.time() > deadline:
+                break
+            time.sleep(0.01)
+
+        self.main_engine.add_app(AlgoTradingApp)
+        self.algo_engine = self.main_engine.get_engine(APP_NAME)
+
+    def tearDown(self):
+        """"""
+        self.algo_engine.close()
+        self.event_engine.stop()
+
+    def send_order(self, req):
+        """"""
+        self.requests.append(req)
+        return f"{self.gateway.gateway_name}.{len(self.requests)}"
+
+    def test_requote(self):
+        """
+        Depth snapshot -> requote timer -> ladder of orders on both sides.
+        """
+        self.algo_engine.init_engine({
+            "vt_symbol": f"{SYMBOL}.{Exchange.FMEX.value}",
+            "volume": 100,
+            "interval": 0.05,
+            "minimum_distance": 10,
+            "guadan_max_count": MAX_COUNT,
+            "algo_name": "test",
+        })
+        self.algo_engine.start_engine()
+
+        self.gateway.ws_api.on_depth({
+            "type": f"depth.L20.{SYMBOL.lower()}",
+            "ts": int(time.time() * 1000),
+            "bids": [9000.0, 10, 8999.5, 20],
+            "asks": [9000.5, 10, 9001.0, 20],
+        })
+
+        deadline = time.time() + 5
+        while len(self.requests) < MAX_COUNT * 2 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.requests), MAX_COUNT * 2)
+
+        shorts = sorted(r.price for r in self.requests if r.direction == Direction.SHORT)
+        longs = sorted(r.price for r in self.requests if r.direction == Direction.LONG)
+        self.assertEqual(shorts, [9010.5, 9011.0, 9011.5])
+        self.assertEqual(longs, [8989.0, 8989.5, 8990.0])
+
+
+class AsyncAlgoEngineTest(AlgoEngineTest):
+    """"""
+
+    engine_class = AsyncEventEngine
+
+
+if __name__ == "__main__":
+    unittest.main()
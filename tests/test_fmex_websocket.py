@@ -0,0 +1,130 @@
+"""
+FMEX private websocket stream against local stand-in server.
+"""
+
+import time
+import unittest
+from queue import Queue
+
+from vnpy.event import AsyncEventEngine, EventEngine
+from vnpy.gateway.fmex.fmex_gateway import (
+    FmexGateway,
+    ORDER_TOPIC,
+    TRADE_TOPIC,
+    RECONCILE_INTERVAL,
+)
+from vnpy.trader.constant import Direction, Status
+from vnpy.trader.event import EVENT_ORDER, EVENT_TRADE
+
+from fmex_ws_server import FmexStandInServer
+
+KEY = "test-key"
+SECRET = "test-secret"
+
+
+class FmexPrivateStreamTest(unittest.TestCase):
+    """"""
+
+    engine_class = EventEngine
+
+    def setUp(self):
+        """"""
+        self.server = FmexStandInServer(KEY, SECRET)
+        self.server.start()
+
+        self.event_engine = self.engine_class(interval=0)
+        self.events = Queue()
+        self.event_engine.register(EVENT_ORDER, self.events.put)
+        self.event_engine.register(EVENT_TRADE, self.events.put)
+        self.event_engine.start()
+
+        self.gateway = FmexGateway(self.event_engine)
+        self.reconciles = []
+        self.gateway.rest_api.query_open_order = lambda: self.reconciles.append(1)
+
+        ws_api = self.gateway.ws_api
+        ws_api.key = KEY
+        ws_api.secret = SECRET.encode()
+        ws_api.init(self.server.url)
+        ws_api.start()
+
+    def tearDown(self):
+        """"""
+        self.gateway.ws_api.stop()
+        self.server.stop()
+        self.event_engine.stop()
+
+    def get_event(self, type: str):
+        """"""
+        event = self.events.get(timeout=5)
+        self.assertEqual(event.type, type)
+        return event.data
+
+    def test_private_stream(self):
+        """
+        hello -> auth -> order and trade push -> on_order / on_trade.
+        """
+        auth = self.server.wait_command("auth")
+        self.assertIsNotNone(auth)
+
+        sub = self.server.wait_command("sub")
+        while sub and ORDER_TOPIC not in sub["args"]:
+            sub = self.server.wait_command("sub")
+        self.assertEqual(sub["args"], [ORDER_TOPIC, TRADE_TOPIC])
+
+        # Reconcile once after auth, then poll at low cadence.
+        deadline = time.time() + 5
+        while not self.reconciles and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.reconciles, [1])
+        self.assertEqual(self.gateway.query_interval, RECONCILE_INTERVAL)
+
+        now = int(time.time() * 1000)
+        order_data = {
+            "id": 1001,
+            "symbol": "btcusd_p",
+            "type": "limit",
+            "direction": "long",
+            "price": 9000.5,
+            "quantity": 100,
+            "unfilled_quantity": 100,
+            "status": "PENDING",
+            "created_at": now,
+        }
+        self.server.push({"type": ORDER_TOPIC, "data": order_data})
+
+        order = self.get_event(EVENT_ORDER)
+        self.assertEqual(order.symbol, "BTCUSD_P")
+        self.assertEqual(order.status, Status.NOTTRADED)
+
+        self.server.push({"type": TRADE_TOPIC, "data": {
+            "id": 2001,
+            "order_id": 1001,
+            "symbol": "btcusd_p",
+            "direction": "long",
+            "price": 9000.5,
+            "quantity": 100,
+            "created_at": now,
+        }})
+
+        trade = self.get_event(EVENT_TRADE)
+        self.assertEqual(trade.vt_orderid, order.vt_orderid)
+        self.assertEqual(trade.direction, Direction.LONG)
+        self.assertEqual(trade.volume, 100)
+
+        order_data.update(unfilled_quantity=0, status="FULLY_FILLED")
+        self.server.push({"type": ORDER_TOPIC, "data": order_data})
+
+        order = self.get_event(EVENT_ORDER)
+        self.assertEqual(order.status, Status.ALLTRADED)
+        self.assertEqual(order.traded, 100)
+
+
+class AsyncFmexPrivateStreamTest(FmexPrivateStreamTest):
+    """"""
+
+    engine_class = AsyncEventEngine
+
+
+if __name__ == "__main__":
+    unittest.main()
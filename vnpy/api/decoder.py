@@ -0,0 +1,26 @@
+"""
+JSON decoder used by websocket and REST clients.
+
+Uses the fastest backend installed (orjson, then ujson), and falls
+back to json of standard library.
+"""
+
+try:
+    from orjson import loads
+    BACKEND = "orjson"
+except ImportError:
+    try:
+        from ujson import loads
+        BACKEND = "ujson"
+    except ImportError:
+        from json import loads
+        BACKEND = "json"
+
+
+def decode(data):
+    """
+    Decode JSON text (str or bytes) into Python object.
+
+    Invalid text raises ValueError for all backends.
+    """
+    return loads(data)
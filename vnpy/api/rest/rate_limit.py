@@ -0,0 +1,81 @@
+"""
+Token bucket for client side request rate limiting.
+"""
+
+from threading import Lock
+from time import monotonic
+
+
+class TokenBucket:
+    """
+    Bucket holding up to capacity tokens, refilled continuously at
+    capacity per period seconds. Each request takes one token.
+    """
+
+    def __init__(self, capacity: int, period: float):
+        """"""
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+
+        self.tokens = capacity
+        self.time = monotonic()
+        self.lock = Lock()
+
+    def _refill(self):
+        """
+        Add tokens accumulated since last refill, must be called with
+        lock held.
+        """
+        now = monotonic()
+        tokens = self.tokens + (now - self.time) * self.rate
+        self.tokens = min(tokens, self.capacity)
+        self.time = now
+
+    @property
+    def remaining(self):
+        """
+        Number of requests that can be sent now.
+        """
+        with self.lock:
+            self._refill()
+            return int(self.tokens)
+
+    def consume(self, reserve: int = 0, force: bool = False):
+        """
+        Take a token if more than reserve tokens are left. Return False
+        if request should not be sent. With force, token is always
+        taken (never below zero) and True returned.
+        """
+        with self.lock:
+            self._refill()
+
+            if self.tokens >= reserve + 1:
+                self.tokens -= 1
+                return True
+
+            if force:
+                self.tokens = max(self.tokens - 1, 0)
+                return True
+
+            return False
+
+    def update(self, limit: int = 0, remaining: int = None):
+        """
+        Update with limit and remaining reported by server.
+        """
+        with self.lock:
+            self._refill()
+
+            if limit and limit != self.capacity:
+                self.capacity = limit
+                self.rate = limit / self.period
+
+            if remaining is not None:
+                self.tokens = min(self.tokens, remaining)
+
+    def reset(self):
+        """"""
+        with self.lock:
+            self.tokens = self.capacity
+            self.time = monotonic()
@@ -1,15 +1,17 @@
-import multiprocessing
-import os
 import sys
+import time
 import traceback
+from collections import OrderedDict, deque
+from itertools import count
 from datetime import datetime
 from enum import Enum
-from multiprocessing.dummy import Pool
-from threading import Lock
+from threading import Condition, Lock, Thread
 from typing import Any, Callable, List, Optional, Union
 
 import requests
 
+from vnpy.api.decoder import decode
+
 
 class RequestStatus(Enum):
     ready = 0  # Request created
@@ -18,7 +20,53 @@ class RequestStatus(Enum):
     error = 3  # Exception raised
 
 
-pool: multiprocessing.pool.Pool = Pool(os.cpu_count() * 20)
+class RequestPriority(Enum):
+    cancel = 0  # Cancel order, always sent first
+    order = 1  # New order
+    query = 2  # Account, position and order query
+
+
+class RequestLane:
+    """
+    Pending requests of one priority, with queue depth metrics.
+    """
+
+    def __init__(self):
+        """"""
+        self.requests = deque()
+        self.max_depth = 0
+        self.total = 0
+
+    def to_dict(self):
+        """"""
+        return {
+            "depth": len(self.requests),
+            "max_depth": self.max_depth,
+            "total": self.total,
+        }
+
+
+class SessionInfo:
+    """
+    Pooled HTTP session with reuse count and handshake timing.
+    """
+
+    def __init__(self, session: requests.Session):
+        """"""
+        self.session = session
+        self.reuse_count = 0
+        self.handshake_time = 0     # First probe, including TCP and TLS
+        self.probe_time = 0         # Last probe
+
+    def to_dict(self):
+        """
+        Get statistics with time in milliseconds.
+        """
+        return {
+            "reuse_count": self.reuse_count,
+            "handshake_time": self.handshake_time * 1000,
+            "probe_time": self.probe_time * 1000,
+        }
 
 
 class Request(object):
@@ -37,6 +85,8 @@ class Request(object):
         on_failed: Callable = None,
         on_error: Callable = None,
         extra: Any = None,
+        priority: RequestPriority = RequestPriority.query,
+        coalesce_key: str = "",
     ):
         """"""
         self.method = method
@@ -49,6 +99,17 @@ class Request(object):
         self.on_failed = on_failed
         self.on_error = on_error
         self.extra = extra
+        self.priority = priority
+
+        # Callbacks of identical requests added while this one pending
+        self.coalesce_key = coalesce_key
+        self.attached: List[Callable] = []
+
+        # Increasing number assigned when request is sent, so responses
+        # can be ordered by the time their data was queried.
+        self.sequence = 0
+
+        self.create_time = time.monotonic()
 
         self.response = None
         self.status = RequestStatus.ready
@@ -86,20 +147,28 @@ class RestClient(object):
     * Reimplement on_failed function to handle Non-2xx responses.
     * Use on_failed parameter in add_request function for individual Non-2xx response handling.
     * Reimplement on_error function to handle exception msg.
+
+    Requests are sent by a fixed number of worker threads owned by the
+    client. Pending requests wait in one lane per RequestPriority, and
+    workers always take from the highest priority lane first, so
+    cancels never queue behind new orders or queries.
+
+    Each worker borrows a session from a fixed size pool created by
+    start, use warm_sessions to open connections before first request.
     """
 
     class Session:
 
-        def __init__(self, client: "RestClient", session: requests.Session):
+        def __init__(self, client: "RestClient", info: SessionInfo):
             self.client = client
-            self.session = session
+            self.info = info
 
         def __enter__(self):
-            return self.session
+            self.info.reuse_count += 1
+            return self.info.session
 
         def __exit__(self, exc_type, exc_val, exc_tb):
-            with self.client._sessions_lock:
-                self.client._sessions.append(self.session)
+            self.client._put_session(self.info)
 
     def __init__(self):
         """
@@ -109,10 +178,23 @@ class RestClient(object):
 
         self.proxies = None
 
-        self._tasks_lock = Lock()
-        self._tasks: List[multiprocessing.pool.AsyncResult] = []
+        self._lock = Lock()
+        self._condition = Condition(self._lock)
+        self._idle_condition = Condition(self._lock)
+        self._lanes = {priority: RequestLane() for priority in RequestPriority}
+        self._lane_list = list(self._lanes.values())     # By priority
+
+        # Requests added but not finished yet, oldest first. Insert and
+        # remove are O(1).
+        self._inflight = OrderedDict()
+        self._workers: List[Thread] = []
+        self._coalesced = {}
+        self._sequence = count(1)
+
         self._sessions_lock = Lock()
-        self._sessions: List[requests.Session] = []
+        self._sessions_condition = Condition(self._sessions_lock)
+        self._sessions: List[SessionInfo] = []
+        self._session_infos: List[SessionInfo] = []
 
     def init(self, url_base: str, proxy_host: str = "", proxy_port: int = 0):
         """
@@ -131,24 +213,131 @@ class RestClient(object):
 
     def start(self, n: int = 3):
         """
-        Start rest client with session count n.
+        Start rest client with n worker threads and n sessions.
         """
         if self._active:
             return
         self._active = True
 
+        if not self._session_infos:
+            self._session_infos = [
+                SessionInfo(self._create_session()) for i in range(n)
+            ]
+            self._sessions = list(self._session_infos)
+
+        self._workers = [
+            Thread(target=self._run, daemon=True) for i in range(n)
+        ]
+        for worker in self._workers:
+            worker.start()
+
     def stop(self):
         """
-        Stop rest client immediately.
+        Stop rest client immediately, requests not sent yet are dropped.
         """
-        self._active = False
+        with self._lock:
+            self._active = False
+            for lane in self._lane_list:
+                lane.requests.clear()
+            self._inflight.clear()
+
+            self._condition.notify_all()
+            self._idle_condition.notify_all()
+
+        # Wake workers waiting for a session
+        with self._sessions_lock:
+            self._sessions_condition.notify_all()
 
     def join(self):
         """
         Wait till all requests are processed.
         """
-        for task in self._tasks:
-            task.wait()
+        with self._lock:
+            while self._active and self._inflight:
+                self._idle_condition.wait()
+
+    def get_inflight_count(self):
+        """
+        Get number of requests waiting or being sent.
+        """
+        return len(self._inflight)
+
+    def get_oldest_age(self):
+        """
+        Get seconds since the oldest unfinished request was added.
+        """
+        with self._lock:
+            if not self._inflight:
+                return 0
+            request = next(iter(self._inflight))
+
+        return time.monotonic() - request.create_time
+
+    def warm_sessions(
+        self,
+        path: str = "",
+        wait: bool = True,
+        timeout: float = 3,
+        keep: int = 1,
+    ):
+        """
+        Open connections of idle sessions in parallel with a GET to
+        path, so that following requests reuse warm keep-alive
+        connections. Timings of probes are kept in session stats.
+
+        keep sessions are left idle for real requests during probing,
+        use 0 only before any request is added (e.g. at connect).
+        """
+        with self._sessions_lock:
+            count = max(len(self._sessions) - keep, 0)
+            infos = self._sessions[:count]
+            self._sessions = self._sessions[count:]
+
+        url = self.make_full_url(path)
+        threads = [
+            Thread(
+                target=self._warm_session,
+                args=(info, url, timeout),
+                daemon=True
+            )
+            for info in infos
+        ]
+        for thread in threads:
+            thread.start()
+
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _warm_session(self, info: SessionInfo, url: str, timeout: float):
+        """"""
+        start = time.perf_counter()
+        try:
+            info.session.get(url, proxies=self.proxies, timeout=timeout)
+        except Exception:
+            pass
+        else:
+            info.probe_time = time.perf_counter() - start
+            if not info.handshake_time:
+                info.handshake_time = info.probe_time
+        finally:
+            self._put_session(info)
+
+    def get_session_stats(self):
+        """
+        Get reuse count and probe timings of each pooled session.
+        """
+        return [info.to_dict() for info in self._session_infos]
+
+    def get_queue_depths(self):
+        """
+        Get pending depth, max depth and total requests of each lane.
+        """
+        with self._lock:
+            return {
+                priority.name: lane.to_dict()
+                for priority, lane in self._lanes.items()
+            }
 
     def add_request(
         self,
@@ -161,6 +350,8 @@ class RestClient(object):
         on_failed: Callable = None,
         on_error: Callable = None,
         extra: Any = None,
+        priority: RequestPriority = RequestPriority.query,
+        coalesce_key: str = "",
     ):
         """
         Add a new request.
@@ -173,8 +364,19 @@ class RestClient(object):
         :param on_failed: callback function if Non-2xx status, type, type: (code, dict, Request)
         :param on_error: callback function when catching Python exception, type: (etype, evalue, tb, Request)
         :param extra: Any extra data which can be used when handling callback
+        :param priority: lane of request, cancel > order > query
+        :param coalesce_key: for idempotent request, if a request with same key is still pending or in flight,
+            callback is attached to it instead of sending a new one (on_failed and on_error of the first request apply)
         :return: Request
         """
+        if coalesce_key:
+            with self._lock:
+                request = self._coalesced.get(coalesce_key, None)
+                if request:
+                    if callback != request.callback and callback not in request.attached:
+                        request.attached.append(callback)
+                    return request
+
         request = Request(
             method=method,
             path=path,
@@ -185,31 +387,90 @@ class RestClient(object):
             on_failed=on_failed,
             on_error=on_error,
             extra=extra,
+            priority=priority,
+            coalesce_key=coalesce_key,
         )
-        task = pool.apply_async(
-            self._process_request,
-            args=[request, ],
-            callback=self._clean_finished_tasks,
-            # error_callback=lambda e: self.on_error(type(e), e, e.__traceback__, request),
-        )
-        self._push_task(task)
+
+        lane = self._lanes[priority]
+        with self._lock:
+            if coalesce_key:
+                self._coalesced[coalesce_key] = request
+
+            lane.requests.append(request)
+            self._inflight[request] = None
+            lane.total += 1
+            depth = len(lane.requests)
+            if depth > lane.max_depth:
+                lane.max_depth = depth
+            self._condition.notify()
+
         return request
 
-    def _push_task(self, task):
-        with self._tasks_lock:
-            self._tasks.append(task)
+    def is_coalesced(self, coalesce_key: str):
+        """
+        Check if a request with coalesce_key is still pending or in flight,
+        so that a new one with same key will not be sent.
+        """
+        return coalesce_key in self._coalesced
+
+    def _release_coalesced(self, request: Request):
+        """
+        Stop attaching callbacks once response is received.
+        """
+        if not request.coalesce_key:
+            return
+
+        with self._lock:
+            if self._coalesced.get(request.coalesce_key, None) is request:
+                self._coalesced.pop(request.coalesce_key)
+
+    def _pop_request(self):
+        """
+        Pop request from highest priority lane, must be called with lock held.
+        """
+        for lane in self._lane_list:
+            if lane.requests:
+                return lane.requests.popleft()
+        return None
+
+    def _run(self):
+        """
+        Worker thread processing requests till client stopped.
+        """
+        while True:
+            with self._lock:
+                request = self._pop_request()
+                while self._active and not request:
+                    self._condition.wait()
+                    request = self._pop_request()
+
+                if not self._active:
+                    return
+
+            self._process_request(request)
 
-    def _clean_finished_tasks(self, result: None):
-        with self._tasks_lock:
-            not_finished_tasks = [i for i in self._tasks if not i.ready()]
-            self._tasks = not_finished_tasks
+            with self._lock:
+                self._inflight.pop(request, None)
+                if not self._inflight:
+                    self._idle_condition.notify_all()
 
     def _get_session(self):
+        """
+        Borrow a session from pool, wait if all are in use. Return None
+        if client is stopped.
+        """
         with self._sessions_lock:
-            if self._sessions:
-                return self.Session(self, self._sessions.pop())
-            else:
-                return self.Session(self, self._create_session())
+            while not self._sessions:
+                if not self._active:
+                    return None
+                self._sessions_condition.wait()
+            return self.Session(self, self._sessions.pop())
+
+    def _put_session(self, info: SessionInfo):
+        """"""
+        with self._sessions_lock:
+            self._sessions.append(info)
+            self._sessions_condition.notify()
 
     def sign(self, request: Request):
         """
@@ -263,29 +524,40 @@ class RestClient(object):
         """
         Sending request to server and get result.
         """
+        pooled = self._get_session()
+        if not pooled:
+            return
+
         try:
-            with self._get_session() as session:
+            with pooled as session:
                 request = self.sign(request)
 
                 url = self.make_full_url(request.path)
 
-                response = session.request(
-                    request.method,
-                    url,
-                    headers=request.headers,
-                    params=request.params,
-                    data=request.data,
-                    proxies=self.proxies,
-                )
+                request.sequence = next(self._sequence)
+                try:
+                    response = session.request(
+                        request.method,
+                        url,
+                        headers=request.headers,
+                        params=request.params,
+                        data=request.data,
+                        proxies=self.proxies,
+                    )
+                finally:
+                    self._release_coalesced(request)
+
                 request.response = response
                 status_code = response.status_code
                 if status_code // 100 == 2:  # 2xx codes are all successful
                     if status_code == 204:
                         json_body = None
                     else:
-                        json_body = response.json()
+                        json_body = decode(response.content)
 
                     request.callback(json_body, request)
+                    for callback in request.attached:
+                        callback(json_body, request)
                     request.status = RequestStatus.success
                 else:
                     request.status = RequestStatus.failed
@@ -295,6 +567,7 @@ class RestClient(object):
                     else:
                         self.on_failed(status_code, request)
         except Exception:
+            self._release_coalesced(request)
             request.status = RequestStatus.error
             t, v, tb = sys.exc_info()
             if request.on_error:
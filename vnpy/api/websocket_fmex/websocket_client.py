@@ -1,15 +1,18 @@
 import json
+import random
 import ssl
 import sys
 import traceback
 import socket
 from datetime import datetime
-from threading import Lock, Thread
+from threading import Event, Lock, Thread
 from time import sleep
 import time
 
 import websocket
 
+from vnpy.api.decoder import decode
+
 
 class WebsocketClient(object):
     """
@@ -32,6 +35,10 @@ class WebsocketClient(object):
 
     After start() is called, the ping thread will ping server every 60 seconds.
 
+    Lost connection is retried with exponential backoff (with jitter) from
+    reconnect_base up to reconnect_max seconds, reset after a packet is
+    received.
+
     If you want to send anything other than JSON, override send_packet.
     """
 
@@ -51,6 +58,18 @@ class WebsocketClient(object):
         self.ping_interval = 60     # seconds
         self.header = {}
 
+        self.reconnect_base = 1     # seconds
+        self.reconnect_max = 60     # seconds
+        self.reconnect_reset = 30   # seconds of uptime to reset delay
+        self._reconnect_count = 0
+        self._connected_time = 0
+        self._stop_event = Event()
+
+        # Local time of last packet received and decoded, for latency
+        # measurement in on_packet.
+        self.received_time = 0
+        self.parsed_time = 0
+
         # For debugging
         self._last_sent_text = None
         self._last_received_text = None
@@ -78,6 +97,7 @@ class WebsocketClient(object):
         """
 
         self._active = True
+        self._stop_event.clear()
         self._worker_thread = Thread(target=self._run)
         self._worker_thread.start()
 
@@ -89,6 +109,7 @@ class WebsocketClient(object):
         Stop the client.
         """
         self._active = False
+        self._stop_event.set()
         self._disconnect()
 
     def join(self):
@@ -142,6 +163,7 @@ class WebsocketClient(object):
                     http_proxy_port=self.proxy_port,
                     header=self.header
                 )
+                self._connected_time = time.time()
                 triggered = True
         if triggered:
             self.on_connected()
@@ -171,13 +193,16 @@ class WebsocketClient(object):
                     ws = self._ws
                     if ws:
                         text = ws.recv()
+                        self.received_time = time.time()
 
                         # ws object is closed when recv function is blocking
                         if not text:
                             self._disconnect()
+                            self._wait_reconnect()
                             continue
 
-                        self._record_last_received_text(text)
+                        # Keep reference only, sliced when exception raised.
+                        self._last_received_text = text
 
                         try:
                             data = self.unpack_data(text)
@@ -185,30 +210,57 @@ class WebsocketClient(object):
                             print("websocket unable to parse data: " + text)
                             raise e
 
+                        self.parsed_time = time.time()
                         self.on_packet(data)
                 # ws is closed before recv function is called
                 # For socket.error, see Issue #1608
                 except (websocket.WebSocketConnectionClosedException, socket.error):
                     self._disconnect()
+                    self._wait_reconnect()
 
                 # other internal exception raised in on_packet
                 except:  # noqa
                     et, ev, tb = sys.exc_info()
                     self.on_error(et, ev, tb)
                     self._disconnect()
+                    self._wait_reconnect()
         except:  # noqa
             et, ev, tb = sys.exc_info()
             self.on_error(et, ev, tb)
         self._disconnect()
 
+    def _wait_reconnect(self):
+        """
+        Sleep before next connection attempt, delay doubles on each
+        consecutive failure and is randomized to avoid reconnect storms.
+
+        Delay is reset only if last connection stayed up for
+        reconnect_reset seconds, so a server accepting and then dropping
+        connections (even after sending a packet) is still backed off.
+        """
+        if (
+            self._connected_time
+            and time.time() - self._connected_time >= self.reconnect_reset
+        ):
+            self._reconnect_count = 0
+        self._connected_time = 0
+
+        delay = min(
+            self.reconnect_max,
+            self.reconnect_base * 2 ** min(self._reconnect_count, 16)
+        )
+        self._reconnect_count += 1
+        self._stop_event.wait(random.uniform(delay / 2, delay))
+
     @staticmethod
     def unpack_data(data: str):
         """
-        Default serialization format is json.
+        Default serialization format is json, decoded by the fastest
+        JSON backend installed.
 
         override this method if you want to use other serialization format.
         """
-        return json.loads(data)
+        return decode(data)
 
     def _run_ping(self):
         """"""
@@ -276,7 +328,9 @@ class WebsocketClient(object):
             datetime.now().isoformat(), exception_type
         )
         text += "LastSentText:\n{}\n".format(self._last_sent_text)
-        text += "LastReceivedText:\n{}\n".format(self._last_received_text)
+        text += "LastReceivedText:\n{}\n".format(
+            self._last_received_text and self._last_received_text[:1000]
+        )
         text += "Exception trace: \n"
         text += "".join(
             traceback.format_exception(exception_type, exception_value, tb)
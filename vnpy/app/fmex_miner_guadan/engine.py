@@ -1,8 +1,8 @@
 import time
-from vnpy.event import EventEngine, Event
+from vnpy.event import EventEngine, Event, EVENT_OVERLOAD
 from vnpy.trader.engine import BaseEngine, MainEngine
 from vnpy.trader.event import (
-    EVENT_TICK, EVENT_TIMER, EVENT_ORDER, EVENT_TRADE)
+    EVENT_TICK, EVENT_ORDER, EVENT_ORDERS, EVENT_TRADE, EVENT_MARKET_STALE)
 from vnpy.trader.constant import (Direction, Offset, OrderType)
 from vnpy.trader.object import (OrderRequest)
 
@@ -15,6 +15,10 @@ EVENT_ALGO_SETTING = "eAlgoSetting"
 EVENT_ALGO_VARIABLES = "eAlgoVariables"
 EVENT_ALGO_PARAMETERS = "eAlgoParameters"
 
+# Overload of these types pauses requoting. Overload of other types,
+# e.g. log in background lane, does not delay quoting.
+PAUSE_TYPES = {EVENT_TICK, EVENT_ORDER, EVENT_ORDERS}
+
 
 class AlgoEngine(BaseEngine):
     """"""
@@ -28,7 +32,9 @@ class AlgoEngine(BaseEngine):
         self.volume = 0
         self.last_tick = None
         self.register_event()
-        self.timer_count = 1
+        self.requote_timer = None
+        self.overloaded_types = set()
+        self.stale_symbols = set()
         self.start_pcent=1
         self.end_pcent=1
         self.algo = 'algoname'
@@ -55,31 +61,46 @@ class AlgoEngine(BaseEngine):
         self.price_tick = self.get_contract(self.vt_symbol).pricetick
 
     def start_engine(self):
-        pass
+        """"""
+        self.requote_timer = self.event_engine.call_every(
+            self.interval, self.requote
+        )
+
+    def close(self):
+        """"""
+        if self.requote_timer:
+            self.requote_timer.cancel()
 
 
     def register_event(self):
         """"""
         self.event_engine.register(EVENT_TICK, self.process_tick_event)
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
         self.event_engine.register(EVENT_ORDER, self.process_order_event)
         self.event_engine.register(EVENT_TRADE, self.process_trade_event)
+        self.event_engine.register(EVENT_OVERLOAD, self.process_overload_event)
+        self.event_engine.register(EVENT_MARKET_STALE, self.process_market_stale_event)
+
+        # Pause state is read by requote timer on first worker.
+        self.event_engine.pin_types([EVENT_OVERLOAD, EVENT_MARKET_STALE])
 
     def process_tick_event(self, event: Event):
         """"""
         self.last_tick = event.data
 
-    def process_timer_event(self, event: Event):
-        """"""
+    def requote(self):
+        """
+        Called every interval seconds to update pending orders.
+        """
         if not self.last_tick:
             return
 
-        self.timer_count += 1
-
-        if self.timer_count < self.interval:
+        # Pause requoting while event engine is falling behind.
+        if self.overloaded_types:
             return
 
-        self.timer_count = 0
+        # Pause requoting until fresh depth snapshot arrives.
+        if self.vt_symbol in self.stale_symbols:
+            return
 
         price_list_old = []
 
@@ -114,6 +135,14 @@ class AlgoEngine(BaseEngine):
         if (self.guadan_max_count*2 - len(open_order_list)) < 4:
             return
 
+        # Do not start a ladder which can not be completed within budget.
+        # Only gateways with client side rate limit report the budget.
+        gateway = self.main_engine.get_gateway(self.contract.gateway_name)
+        get_rate_limit = getattr(gateway, "get_rate_limit", None)
+        if get_rate_limit and get_rate_limit()["order"] < self.guadan_max_count * 2:
+            self.write_log("下单频率额度不足，跳过本轮挂单")
+            return
+
         for i in range(0, self.guadan_max_count):
             self.sell_new_short_order(short_start_price + 0.5 * i, price_list_old)
             self.sell_new_long_order(long_start_price - 0.5 * i, price_list_old)
@@ -134,6 +163,30 @@ class AlgoEngine(BaseEngine):
         """"""
         pass
 
+    def process_overload_event(self, event: Event):
+        """"""
+        data = event.data
+        if data["type"] not in PAUSE_TYPES:
+            return
+
+        if data["overloaded"]:
+            self.overloaded_types.add(data["type"])
+            self.write_log(f"事件队列过载，暂停挂单：{data['type']} {data['pending']}")
+        else:
+            self.overloaded_types.discard(data["type"])
+            self.write_log(f"事件队列恢复：{data['type']}")
+
+    def process_market_stale_event(self, event: Event):
+        """"""
+        data = event.data
+
+        if data["stale"]:
+            self.stale_symbols.add(data["vt_symbol"])
+            self.write_log(f"行情数据失效，暂停挂单：{data['vt_symbol']} {data['reason']}")
+        else:
+            self.stale_symbols.discard(data["vt_symbol"])
+            self.write_log(f"行情数据恢复：{data['vt_symbol']}")
+
 
     def subscribe(self):
         """"""
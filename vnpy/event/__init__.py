@@ -1 +1,12 @@
-from .engine import Event, EventEngine, EVENT_TIMER
+from .engine import (
+    Event,
+    EventEngine,
+    OverloadPolicy,
+    EVENT_TIMER,
+    EVENT_PROFILE,
+    EVENT_OVERLOAD,
+    LANE_CRITICAL,
+    LANE_BACKGROUND
+)
+from .async_engine import AsyncEventEngine
+from .journal import EventJournal, read_journal, replay_journal
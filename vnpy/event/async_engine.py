@@ -0,0 +1,168 @@
+"""
+Event engine running dispatch and timers on an asyncio event loop.
+"""
+
+import asyncio
+from threading import Lock, Thread, get_ident
+from time import monotonic
+from typing import Any, Callable, Coroutine, Sequence
+
+from .engine import EventEngine, EventSlot, TimerHandle
+
+
+class LoopQueue:
+    """
+    Queue interface used by event engine, which schedules every item
+    to be processed on an asyncio event loop.
+    """
+
+    def __init__(self, engine: "AsyncEventEngine"):
+        """"""
+        self.engine = engine
+        self.size = 0
+        self.lock = Lock()
+
+    def put(self, item: Any):
+        """
+        Schedule item to be processed by loop, safe from any thread.
+        """
+        with self.lock:
+            self.size += 1
+        self.engine.call_soon(self.engine._dispatch_item, item)
+
+    def task_done(self):
+        """
+        Called by loop after an item is processed.
+        """
+        with self.lock:
+            self.size -= 1
+
+    def qsize(self):
+        """
+        Get number of items scheduled but not processed yet.
+        """
+        return self.size
+
+
+class AsyncEventEngine(EventEngine):
+    """
+    Event engine with event dispatch and timers (EVENT_TIMER,
+    call_later and call_every) all running on one asyncio event loop
+    in a single thread, instead of a dispatch thread plus a timer
+    thread.
+
+    put, register and timer functions keep the same interface as
+    EventEngine and are thread-safe, so gateways and apps written for
+    EventEngine run on it unchanged. Coroutines can also be run on
+    the loop with run_coroutine.
+    """
+
+    def __init__(self, interval: float = 1, conflate_types: Sequence[str] = None):
+        """"""
+        super(AsyncEventEngine, self).__init__(interval, conflate_types)
+
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread_id = None
+
+        self._queue = LoopQueue(self)
+        self._queues = [self._queue]
+        self._thread = Thread(target=self._run_loop)
+        self._threads = [self._thread]
+
+    def _run_loop(self):
+        """
+        Run event loop till engine stopped.
+        """
+        self._loop_thread_id = get_ident()
+        self._dispatch_thread_ids.add(self._loop_thread_id)
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def call_soon(self, callback: Callable, *args):
+        """
+        Schedule callback to be run by loop, safe from any thread.
+        """
+        if get_ident() == self._loop_thread_id:
+            self.loop.call_soon(callback, *args)
+        else:
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def _dispatch_item(self, item: Any):
+        """
+        Process an item put into loop queue.
+        """
+        self._queue.task_done()
+
+        if type(item) is EventSlot:
+            item = self._pop_slot(item)
+            if item is None:
+                return
+
+        self._process(item)
+
+    def _fire_timer(self, handle: TimerHandle):
+        """
+        Run timer callback and schedule its next deadline if repeating.
+        """
+        if handle.cancelled:
+            return
+
+        if handle.interval:
+            now = self.loop.time()
+            handle.deadline += handle.interval
+            if handle.deadline <= now:
+                missed = (now - handle.deadline) // handle.interval + 1
+                handle.deadline += missed * handle.interval
+            self.loop.call_at(handle.deadline, self._fire_timer, handle)
+
+        handle.run()
+
+    def _schedule(self, handle: TimerHandle):
+        """
+        Schedule timer handle on loop, safe from any thread.
+
+        Loop time is based on time.monotonic, same as deadline.
+        """
+        self.call_soon(self.loop.call_at, handle.deadline, self._fire_timer, handle)
+        return handle
+
+    def set_virtual_time(self, now: float):
+        """
+        Timers run on loop clock, virtual time is not supported.
+        """
+        raise NotImplementedError("AsyncEventEngine不支持虚拟时间")
+
+    def run_coroutine(self, coroutine: Coroutine):
+        """
+        Run coroutine on loop, return a concurrent.futures.Future.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def start(self):
+        """
+        Start event loop and background thread.
+        """
+        self._active = True
+        self._thread.start()
+        self._background_thread.start()
+
+        if self._interval > 0:
+            handle = TimerHandle(
+                self._put_timer_event,
+                monotonic() + self._interval,
+                self._interval
+            )
+            self._schedule(handle)
+
+    def stop(self):
+        """
+        Stop event loop and background thread.
+        """
+        self._active = False
+        with self._slot_condition:
+            self._slot_condition.notify_all()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self._background_thread.join()
+
+        self.stop_journal()
@@ -2,13 +2,28 @@
 Event-driven framework of vn.py framework.
 """
 
-from collections import defaultdict
-from queue import Empty, Queue
-from threading import Thread
-from time import sleep
-from typing import Any, Callable
+import heapq
+from collections import defaultdict, deque
+from enum import Enum
+from itertools import count
+from threading import Condition, Lock, Thread, get_ident
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Sequence
+
+from .profiler import EventProfiler
+
+if TYPE_CHECKING:
+    from .journal import EventJournal
 
 EVENT_TIMER = "eTimer"
+EVENT_PROFILE = "eProfile"
+EVENT_OVERLOAD = "eOverload"
+
+# Handlers on critical path are run by dispatch workers, while
+# background handlers (logging, UI, persistence) are run by a
+# separated thread so that they never block order flow.
+LANE_CRITICAL = "critical"
+LANE_BACKGROUND = "background"
 
 
 class Event:
@@ -16,80 +31,507 @@ class Event:
     Event object consists of a type string which is used
     by event engine for distributing event, and a data
     object which contains the real data.
+
+    An optional topic (e.g. vt_symbol) makes the event also reach
+    handlers registered to type + topic, without putting a second
+    event.
     """
 
-    def __init__(self, type: str, data: Any = None):
+    put_time = 0    # Stamped on sampled events by profiler
+
+    def __init__(self, type: str, data: Any = None, topic: str = ""):
         """"""
         self.type = type
         self.data = data
+        self.topic = topic
 
 
 # Defines handler function to be used in event engine.
 HandlerType = Callable[[Event], None]
 
 
+class OverloadPolicy(Enum):
+    """
+    Policy applied when pending events of a type reach capacity.
+    """
+    BLOCK = "block"                 # wait in put until there is room
+    DROP_OLDEST = "drop_oldest"     # drop the oldest pending event
+    DROP_NEWEST = "drop_newest"     # drop the event being put
+    COALESCE = "coalesce"           # replace pending event of same vt_symbol
+
+
+class EventSlot:
+    """
+    Placeholder kept in event queue for conflated or bounded events.
+
+    For a conflated key, only the latest event put is stored, older
+    ones are overwritten before the dispatcher reaches the slot.
+    Event is set to None after the slot is dispatched or dropped.
+    """
+
+    def __init__(self, key: tuple, event: Event, limit: "QueueLimit" = None):
+        """"""
+        self.key = key
+        self.event = event
+        self.limit = limit
+
+
+class QueueLimit:
+    """
+    Capacity and pending status of an event type in one queue.
+    """
+
+    def __init__(self, capacity: int, policy: OverloadPolicy, threshold: int):
+        """"""
+        self.capacity = capacity
+        self.policy = policy
+        self.threshold = threshold
+
+        self.slots = deque()
+        self.pending = 0
+        self.overloaded = False
+
+
+class TimerHandle:
+    """
+    Handle of a callback scheduled by call_later or call_every,
+    which can be used for cancelling the callback.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[], None],
+        deadline: float,
+        interval: float = 0,
+        queue: "EventQueue" = None
+    ):
+        """"""
+        self.callback = callback
+        self.deadline = deadline    # time.monotonic based
+        self.interval = interval    # 0 for one-shot callback
+        self.queue = queue          # None for running in timer thread
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Cancel the callback. It will not be called any more.
+        """
+        self.cancelled = True
+
+    def run(self):
+        """
+        Call the callback if not cancelled.
+        """
+        if not self.cancelled:
+            self.callback()
+
+
+class EventQueue:
+    """
+    Unbounded FIFO queue which allows consumer to drain all pending
+    items at once, instead of locking once for every single item.
+    """
+
+    def __init__(self):
+        """"""
+        self._items = deque()
+        self._condition = Condition(Lock())
+
+    def put(self, item: Any):
+        """
+        Put an item into queue and wake up consumer.
+        """
+        with self._condition:
+            self._items.append(item)
+            self._condition.notify()
+
+    def drain(self, timeout: float = None):
+        """
+        Wait until any item is available (or timeout) and then
+        take all pending items out of queue.
+        """
+        with self._condition:
+            if not self._items:
+                self._condition.wait(timeout)
+
+            items = self._items
+            self._items = deque()
+
+        return items
+
+    def qsize(self):
+        """
+        Get number of pending items.
+        """
+        return len(self._items)
+
+
 class EventEngine:
     """
     Event engine distributes event object based on its type
     to those handlers registered.
 
     It also generates timer event by every interval seconds,
-    which can be used for timing purpose.
+    which can be used for timing purpose. Callbacks can also be
+    scheduled with call_later and call_every directly.
     """
 
-    def __init__(self, interval: int = 1):
+    def __init__(
+        self,
+        interval: float = 1,
+        conflate_types: Sequence[str] = None,
+        workers: int = 1
+    ):
         """
         Timer event is generated every 1 second by default, if
-        interval not specified.
+        interval not specified. Sub-second interval is supported,
+        and no timer event is generated if interval is 0.
+
+        Event types listed in conflate_types are conflated by the
+        vt_symbol of event data: only the latest event of each
+        (type, vt_symbol) is kept until dispatcher reaches it.
+        All other event types are processed strictly FIFO.
+
+        If workers is larger than 1, critical handlers are run by
+        several threads. Every event is routed to a worker by its
+        shard key, so events with the same key keep their order.
+        Handlers of different shards must not share state unless the
+        event types are pinned with pin_types.
         """
         self._interval = interval
-        self._queue = Queue()
         self._active = False
-        self._thread = Thread(target=self._run)
+
+        self._queues = [EventQueue() for i in range(max(workers, 1))]
+        self._threads = [
+            Thread(target=self._run, args=(queue, self._process))
+            for queue in self._queues
+        ]
+        self._queue = self._queues[0]
+        self._thread = self._threads[0]
+
+        self._background_queue = EventQueue()
+        self._background_thread = Thread(
+            target=self._run,
+            args=(self._background_queue, self._process_background)
+        )
+
         self._timer = Thread(target=self._run_timer)
+        self._timer_heap = []
+        self._timer_condition = Condition(Lock())
+        self._timer_count = count()
+        self._virtual_time = None   # Set when driven by set_virtual_time
+
         self._handlers = defaultdict(list)
         self._general_handlers = []
+        self._background_handlers = defaultdict(list)
+        self._background_general_handlers = []
+
+        # Handler tables rebuilt on register/unregister, mapping event
+        # type to a tuple of all handlers (type and general) to call.
+        self._table = {}
+        self._general_table = ()
+        self._background_table = {}
+        self._background_general_table = ()
 
-    def _run(self):
+        # Tables of type handlers only, used for type + topic dispatch,
+        # and all type prefixes which have such handlers registered.
+        self._topic_table = {}
+        self._background_topic_table = {}
+        self._topic_types = set()
+
+        self._profiler = None
+        self._profile_timer = None
+
+        self._journal = None
+
+        self._conflate_types = set(conflate_types or [])
+        self._conflated_slots = {}
+        self._conflated_count = 0
+
+        self._capacities = {}       # type: (capacity, policy, threshold)
+        self._limits = {}           # (queue id, type): QueueLimit
+        self._slot_types = set(self._conflate_types)
+        self._dropped_count = 0
+        self._dispatch_thread_ids = set()
+
+        self._slot_lock = Lock()
+        self._slot_condition = Condition(self._slot_lock)
+
+        # Types always dispatched by first worker, see pin_types.
+        self._pinned_types = set()
+
+    def _run(self, queue: EventQueue, process: Callable):
         """
-        Get event from queue and then process it.
+        Drain all pending events from queue and then process them.
         """
+        pop_slot = self._pop_slot
+        self._dispatch_thread_ids.add(get_ident())
+
         while self._active:
-            try:
-                event = self._queue.get(block=True, timeout=1)
-                self._process(event)
-            except Empty:
-                pass
+            for event in queue.drain(1):
+                if type(event) is EventSlot:
+                    event = pop_slot(event)
+                    if event is None:
+                        continue
+                elif type(event) is TimerHandle:
+                    event.run()
+                    continue
+
+                process(event)
 
     def _process(self, event: Event):
         """
-        First ditribute event to those handlers registered listening
-        to this type.
+        Distribute event to handlers registered listening to this type,
+        and then to those general handlers which listens to all types.
 
-        Then distrubute event to those general handlers which listens
-        to all types.
+        If event has topic, then also distribute it to handlers
+        registered listening to type + topic.
         """
-        if event.type in self._handlers:
-            [handler(event) for handler in self._handlers[event.type]]
+        type = event.type
+
+        for handler in self._table.get(type, self._general_table):
+            handler(event)
+
+        if event.topic and type in self._topic_types:
+            for handler in self._topic_table.get(type + event.topic, ()):
+                handler(event)
+
+    def _process_background(self, event: Event):
+        """
+        Distribute event to handlers registered in background lane.
+        """
+        type = event.type
+
+        table = self._background_table
+        for handler in table.get(type, self._background_general_table):
+            handler(event)
 
-        if self._general_handlers:
-            [handler(event) for handler in self._general_handlers]
+        if event.topic and type in self._topic_types:
+            for handler in self._background_topic_table.get(type + event.topic, ()):
+                handler(event)
+
+    def _rebuild_tables(self):
+        """
+        Rebuild handler tables after handlers changed.
+        """
+        make_table = self._make_table
+
+        self._table = {
+            type: make_table(handlers, self._general_handlers, type)
+            for type, handlers in self._handlers.items()
+        }
+        self._general_table = make_table([], self._general_handlers)
+
+        # Queue wait is recorded in critical lane only, so an event
+        # dispatched in both lanes is counted once.
+        self._background_table = {
+            type: make_table(handlers, self._background_general_handlers, type, False)
+            for type, handlers in self._background_handlers.items()
+        }
+        self._background_general_table = make_table(
+            [], self._background_general_handlers, None, False
+        )
+
+        self._topic_table = {
+            type: make_table(handlers, [], type, False)
+            for type, handlers in self._handlers.items()
+        }
+        self._background_topic_table = {
+            type: make_table(handlers, [], type, False)
+            for type, handlers in self._background_handlers.items()
+        }
+
+        # e.g. "eTick." and "eTick.BTCUSD_P." for "eTick.BTCUSD_P.FMEX"
+        topic_types = set()
+        for type in list(self._handlers) + list(self._background_handlers):
+            ix = type.find(".")
+            while 0 <= ix < len(type) - 1:
+                topic_types.add(type[:ix + 1])
+                ix = type.find(".", ix + 1)
+        self._topic_types = topic_types
+
+    def _make_table(
+        self,
+        handlers: list,
+        general_handlers: list,
+        type: str = None,
+        record_wait: bool = True
+    ):
+        """
+        Make tuple of handlers to call, wrapped by profiler if enabled.
+        Queue wait is recorded by wrapper of the first handler.
+        """
+        profiler = self._profiler
+        if not profiler:
+            return tuple(handlers + general_handlers)
+
+        table = [
+            profiler.wrap(handler, type, record_wait and not i)
+            for i, handler in enumerate(handlers + general_handlers)
+        ]
+        return tuple(table)
 
     def _run_timer(self):
         """
-        Sleep by interval second(s) and then generate a timer event.
+        Wait until the earliest scheduled deadline, and then run or
+        dispatch all callbacks which are due.
+
+        Deadlines of repeating callbacks are advanced by their interval
+        instead of from the time they are run, so they never drift.
         """
+        heap = self._timer_heap
+        condition = self._timer_condition
+
         while self._active:
-            sleep(self._interval)
-            event = Event(EVENT_TIMER)
-            self.put(event)
+            handles = []
+
+            with condition:
+                # Callbacks are run by set_virtual_time instead.
+                if self._virtual_time is not None:
+                    condition.wait(1)
+                    continue
+
+                now = monotonic()
+
+                while heap and heap[0][0] <= now:
+                    handle = heapq.heappop(heap)[2]
+                    if handle.cancelled:
+                        continue
+                    handles.append(handle)
+
+                    # Skip missed runs if timer thread falls behind.
+                    if handle.interval:
+                        handle.deadline += handle.interval
+                        if handle.deadline <= now:
+                            missed = (now - handle.deadline) // handle.interval + 1
+                            handle.deadline += missed * handle.interval
+                        self._push_timer(handle)
+
+                if not handles:
+                    timeout = heap[0][0] - now if heap else 1
+                    condition.wait(min(timeout, 1))
+
+            self._dispatch_timers(handles)
+
+    def _dispatch_timers(self, handles: list):
+        """
+        Run callbacks or put them into their dispatch queue.
+        """
+        for handle in handles:
+            if handle.queue:
+                handle.queue.put(handle)
+            else:
+                handle.run()
+
+    def _now(self):
+        """
+        Current time of scheduled callbacks.
+        """
+        if self._virtual_time is not None:
+            return self._virtual_time
+        return monotonic()
+
+    def set_virtual_time(self, now: float):
+        """
+        Drive scheduled callbacks by virtual time in seconds, e.g.
+        timestamps of a replayed journal, instead of monotonic clock.
+
+        All callbacks due by now are dispatched before return, in
+        deadline order and once for every interval passed. Deadlines
+        already scheduled are shifted to virtual time when switching
+        clock. Set None to switch back to monotonic clock.
+        """
+        handles = []
+
+        with self._timer_condition:
+            heap = self._timer_heap
+            switched = (self._virtual_time is None) != (now is None)
+            old = self._now()
+            self._virtual_time = now
+
+            if switched:
+                offset = self._now() - old
+                for item in heap:
+                    item[2].deadline += offset
+                heap[:] = [(h.deadline, n, h) for _, n, h in heap]
+                self._timer_condition.notify()
+
+            while now is not None and heap and heap[0][0] <= now:
+                handle = heapq.heappop(heap)[2]
+                if handle.cancelled:
+                    continue
+                handles.append(handle)
+
+                if handle.interval:
+                    handle.deadline += handle.interval
+                    self._push_timer(handle)
+
+        self._dispatch_timers(handles)
+
+    def _push_timer(self, handle: TimerHandle):
+        """
+        Push handle into timer heap. Must be called with timer lock held.
+        """
+        heapq.heappush(
+            self._timer_heap,
+            (handle.deadline, next(self._timer_count), handle)
+        )
+
+    def _schedule(self, handle: TimerHandle):
+        """
+        Add handle into timer heap and wake up timer thread.
+        """
+        with self._timer_condition:
+            self._push_timer(handle)
+            self._timer_condition.notify()
+        return handle
+
+    def _put_timer_event(self):
+        """
+        Generate a timer event.
+        """
+        event = Event(EVENT_TIMER)
+        self.put(event)
+
+    def call_later(self, delay: float, callback: Callable[[], None]):
+        """
+        Call callback once after delay seconds.
+
+        Callback is run by event dispatch thread (the first worker if
+        there are several), so it needs no extra locking against
+        event handlers. Return a TimerHandle for cancellation.
+        """
+        handle = TimerHandle(callback, self._now() + delay, 0, self._queue)
+        return self._schedule(handle)
+
+    def call_every(self, interval: float, callback: Callable[[], None]):
+        """
+        Call callback every interval seconds until cancelled.
+
+        Callback is run by event dispatch thread (the first worker if
+        there are several). Return a TimerHandle for cancellation.
+        """
+        handle = TimerHandle(
+            callback, self._now() + interval, interval, self._queue
+        )
+        return self._schedule(handle)
 
     def start(self):
         """
         Start event engine to process events and generate timer events.
         """
         self._active = True
-        self._thread.start()
+        for thread in self._threads:
+            thread.start()
+        self._background_thread.start()
+
+        if self._interval > 0:
+            handle = TimerHandle(
+                self._put_timer_event,
+                self._now() + self._interval,
+                self._interval
+            )
+            self._schedule(handle)
         self._timer.start()
 
     def stop(self):
@@ -97,47 +539,423 @@ class EventEngine:
         Stop event engine.
         """
         self._active = False
+        with self._timer_condition:
+            self._timer_condition.notify()
+        with self._slot_condition:
+            self._slot_condition.notify_all()
         self._timer.join()
-        self._thread.join()
+        for thread in self._threads:
+            thread.join()
+        self._background_thread.join()
+
+        self.stop_journal()
 
     def put(self, event: Event):
         """
         Put an event object into event queue.
         """
-        self._queue.put(event)
+        type = event.type
+        critical = type in self._table or self._general_table
+        background = type in self._background_table or self._background_general_table
+
+        if event.topic and type in self._topic_types:
+            topic_type = type + event.topic
+            critical = critical or topic_type in self._topic_table
+            background = background or topic_type in self._background_topic_table
+
+        if critical:
+            if len(self._queues) == 1 or type in self._pinned_types:
+                queue = self._queue
+            else:
+                key = self.get_shard_key(event)
+                queue = self._queues[hash(key) % len(self._queues)]
+            self._put_queue(queue, event)
+
+        if background:
+            self._put_queue(self._background_queue, event)
+
+    def _put_queue(self, queue: EventQueue, event: Event):
+        """
+        Put event into a specific queue, with conflation and capacity
+        limit applied if enabled.
+        """
+        if event.type in self._slot_types:
+            self._put_slot(queue, event)
+        else:
+            queue.put(event)
+
+    def _put_slot(self, queue: EventQueue, event: Event):
+        """
+        Put event in a slot into queue.
+
+        For conflated event, overwrite pending event with the same key
+        if any. For bounded event, apply overload policy when pending
+        events reach capacity.
+        """
+        type = event.type
+        limit = self._get_limit(queue, type)
+
+        if type in self._conflate_types or (
+            limit and limit.policy is OverloadPolicy.COALESCE
+        ):
+            key = (id(queue), type, getattr(event.data, "vt_symbol", None))
+        else:
+            key = None
+
+        overload_data = None
+
+        with self._slot_lock:
+            if key:
+                slot = self._conflated_slots.get(key, None)
+                if slot:
+                    slot.event = event
+                    self._conflated_count += 1
+                    return
+
+            if limit:
+                if limit.pending >= limit.capacity:
+                    if not self._apply_policy(limit):
+                        return
+
+                limit.pending += 1
+                if not limit.overloaded and limit.pending >= limit.threshold:
+                    limit.overloaded = True
+                    overload_data = self._get_overload_data(type, limit)
+
+            slot = EventSlot(key, event, limit)
+
+            if key:
+                self._conflated_slots[key] = slot
+            if limit:
+                limit.slots.append(slot)
+
+        queue.put(slot)
+
+        if overload_data:
+            self.put(Event(EVENT_OVERLOAD, overload_data))
+
+    def _apply_policy(self, limit: QueueLimit):
+        """
+        Make room for a new event in a full queue, must be called with
+        slot lock held. Return False if the new event is dropped.
+        """
+        policy = limit.policy
+
+        if policy is OverloadPolicy.DROP_NEWEST:
+            self._dropped_count += 1
+            return False
+
+        elif policy is OverloadPolicy.BLOCK:
+            # Dispatch thread can never wait for itself to make room.
+            if get_ident() in self._dispatch_thread_ids:
+                return True
+
+            while self._active and limit.pending >= limit.capacity:
+                self._slot_condition.wait(1)
+            return True
+
+        # Drop oldest pending event, also used by COALESCE if no pending
+        # event of the same vt_symbol to replace.
+        while limit.slots:
+            slot = limit.slots.popleft()
+            if slot.event is None:
+                continue
+
+            slot.event = None
+            if slot.key:
+                self._conflated_slots.pop(slot.key)
+
+            limit.pending -= 1
+            self._dropped_count += 1
+            break
+
+        return True
+
+    def _pop_slot(self, slot: EventSlot):
+        """
+        Release a slot reached by dispatcher and return the event in it,
+        or None if it was dropped.
+        """
+        overload_data = None
+
+        with self._slot_lock:
+            event = slot.event
+            if event is None:
+                return None
+            slot.event = None
+
+            if slot.key:
+                self._conflated_slots.pop(slot.key)
+
+            limit = slot.limit
+            if limit:
+                limit.pending -= 1
+
+                slots = limit.slots
+                while slots and slots[0].event is None:
+                    slots.popleft()
+
+                if limit.policy is OverloadPolicy.BLOCK:
+                    self._slot_condition.notify_all()
+
+                if limit.overloaded and limit.pending <= limit.threshold // 2:
+                    limit.overloaded = False
+                    overload_data = self._get_overload_data(event.type, limit)
+
+        if overload_data:
+            self.put(Event(EVENT_OVERLOAD, overload_data))
+
+        return event
+
+    def _get_limit(self, queue: EventQueue, type: str):
+        """
+        Get capacity limit of event type in a queue, if set.
+        """
+        if type not in self._capacities:
+            return None
+
+        key = (id(queue), type)
+        limit = self._limits.get(key, None)
+
+        if not limit:
+            with self._slot_lock:
+                limit = self._limits.get(key, None)
+                if not limit:
+                    limit = QueueLimit(*self._capacities[type])
+                    self._limits[key] = limit
+        return limit
+
+    def _get_overload_data(self, type: str, limit: QueueLimit):
+        """"""
+        data = {
+            "type": type,
+            "overloaded": limit.overloaded,
+            "pending": limit.pending,
+            "capacity": limit.capacity,
+            "policy": limit.policy,
+        }
+        return data
+
+    def set_capacity(
+        self,
+        type: str,
+        capacity: int,
+        policy: OverloadPolicy = OverloadPolicy.DROP_OLDEST,
+        threshold: int = 0
+    ):
+        """
+        Limit number of pending events of a type in each queue, and
+        apply policy when capacity reached. Should be called before
+        engine started.
 
-    def register(self, type: str, handler: HandlerType):
+        EVENT_OVERLOAD is put (with data dict of type, overloaded,
+        pending, capacity and policy) when pending events reach
+        threshold (capacity by default), and put again when pending
+        events fall back to half of threshold.
+        """
+        self._capacities[type] = (capacity, policy, threshold or capacity)
+        self._slot_types.add(type)
+
+    def _put_profiled(self, event: Event):
+        """
+        Put event with put time stamped for queue wait profiling.
+        """
+        profiler = self._profiler
+        profiler.put_count += 1
+        if not profiler.put_count % profiler.sample_every:
+            event.put_time = perf_counter()
+        EventEngine.put(self, event)
+
+    def _put_profile_event(self):
+        """
+        Generate a profile summary event.
+        """
+        event = Event(EVENT_PROFILE, self.get_profile())
+        self.put(event)
+
+    def enable_profiling(self, sample_every: int = 16, summary_interval: float = 60):
+        """
+        Start recording per (event type, handler) latency and queue
+        wait time.
+
+        Only one of every sample_every latencies is kept for
+        percentiles, and only one of every sample_every events is
+        stamped for queue wait. A summary event EVENT_PROFILE is put
+        every summary_interval seconds, set it 0 to disable.
+        """
+        if self._profiler:
+            return
+
+        self._profiler = EventProfiler(sample_every)
+        self.put = self._put_profiled
+        self._rebuild_tables()
+
+        if summary_interval:
+            self._profile_timer = self.call_every(
+                summary_interval, self._put_profile_event
+            )
+
+    def disable_profiling(self):
+        """
+        Stop profiling and restore dispatch without instrumentation.
+        """
+        if not self._profiler:
+            return
+
+        if self._profile_timer:
+            self._profile_timer.cancel()
+            self._profile_timer = None
+
+        self.__dict__.pop("put")
+        self._profiler = None
+        self._rebuild_tables()
+
+    def get_profile(self):
+        """
+        Get profiling result, with latency in microseconds:
+        * handlers: {(type, handler name): count/total/p50/p99/max}
+        * queue_wait: count/total/p50/p99/max
+        """
+        if not self._profiler:
+            return {}
+        return self._profiler.get_profile()
+
+    def start_journal(self, journal: "EventJournal"):
+        """
+        Record every event dispatched into an EventJournal.
+
+        Journal is registered as a general handler on critical path,
+        so events are recorded in the order they are dispatched.
+        """
+        if self._journal:
+            return
+
+        self._journal = journal
+        self.register_general(journal.record)
+
+    def stop_journal(self):
+        """
+        Stop recording events and close journal.
+        """
+        if not self._journal:
+            return
+
+        self.unregister_general(self._journal.record)
+        self._journal.close()
+        self._journal = None
+
+    def pin_types(self, types: Sequence[str]):
+        """
+        Dispatch events of types always by the first worker, which also
+        runs call_later and call_every callbacks.
+
+        Handlers of pinned types, and scheduled callbacks, are then
+        never run concurrently with each other and can share state
+        without locking, e.g. order book of OmsEngine read by a timer.
+        """
+        self._pinned_types.update(types)
+
+    def get_shard_key(self, event: Event):
+        """
+        Get key used for routing event to dispatch worker.
+
+        Order and trade events are routed by vt_orderid, tick events
+        by vt_symbol, and all other events by event type. Pinned types
+        are not sharded.
+        """
+        data = event.data
+
+        key = getattr(data, "vt_orderid", None)
+        if key:
+            return key
+
+        key = getattr(data, "vt_symbol", None)
+        if key:
+            return key
+
+        return event.type
+
+    def get_queue_size(self):
+        """
+        Get number of items waiting in event queues.
+        """
+        size = self._background_queue.qsize()
+        for queue in self._queues:
+            size += queue.qsize()
+        return size
+
+    def get_conflated_count(self):
+        """
+        Get number of events dropped by conflation since engine created.
+        """
+        return self._conflated_count
+
+    def get_dropped_count(self):
+        """
+        Get number of events dropped by overload policy since engine
+        created.
+        """
+        return self._dropped_count
+
+    def _get_handler_tables(self, lane: str):
+        """
+        Get type handlers dict and general handlers list of a lane.
+        """
+        if lane == LANE_BACKGROUND:
+            return self._background_handlers, self._background_general_handlers
+        else:
+            return self._handlers, self._general_handlers
+
+    def register(self, type: str, handler: HandlerType, lane: str = LANE_CRITICAL):
         """
         Register a new handler function for a specific event type. Every
         function can only be registered once for each event type.
+
+        Handlers registered with LANE_BACKGROUND are run by background
+        thread and never delay handlers on critical path.
         """
-        handler_list = self._handlers[type]
+        handler_list = self._get_handler_tables(lane)[0][type]
         if handler not in handler_list:
             handler_list.append(handler)
+            self._rebuild_tables()
 
     def unregister(self, type: str, handler: HandlerType):
         """
         Unregister an existing handler function from event engine.
         """
-        handler_list = self._handlers[type]
+        for handlers in (self._handlers, self._background_handlers):
+            if type not in handlers:
+                continue
 
-        if handler in handler_list:
-            handler_list.remove(handler)
+            handler_list = handlers[type]
 
-        if not handler_list:
-            self._handlers.pop(type)
+            if handler in handler_list:
+                handler_list.remove(handler)
 
-    def register_general(self, handler: HandlerType):
+            if not handler_list:
+                handlers.pop(type)
+
+        self._rebuild_tables()
+
+    def register_general(self, handler: HandlerType, lane: str = LANE_CRITICAL):
         """
         Register a new handler function for all event types. Every
         function can only be registered once for each event type.
         """
-        if handler not in self._general_handlers:
-            self._general_handlers.append(handler)
+        general_handlers = self._get_handler_tables(lane)[1]
+        if handler not in general_handlers:
+            general_handlers.append(handler)
+            self._rebuild_tables()
 
     def unregister_general(self, handler: HandlerType):
         """
         Unregister an existing general handler function.
         """
-        if handler in self._general_handlers:
-            self._general_handlers.remove(handler)
+        for general_handlers in (
+            self._general_handlers,
+            self._background_general_handlers
+        ):
+            if handler in general_handlers:
+                general_handlers.remove(handler)
+
+        self._rebuild_tables()
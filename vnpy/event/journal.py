@@ -0,0 +1,203 @@
+"""
+Append-only binary journal of events, and replay of journal.
+"""
+
+import mmap
+import os
+import pickle
+import struct
+from threading import Lock
+from time import sleep, time_ns
+from typing import Sequence
+
+from .engine import EVENT_TIMER, Event, EventEngine
+
+# Record header: timestamp in ns, length of type, length of data.
+# A zero header marks the end of records in preallocated file.
+HEADER = struct.Struct("<qII")
+
+
+class EventJournal:
+    """
+    Writes events into an append-only, memory-mapped file.
+
+    Every record is a fixed size header followed by event type in
+    utf-8 and (topic, data) of event pickled. File is preallocated by chunk_size
+    and grown when full, so writing a record is only a memory copy.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        types: Sequence[str] = None,
+        chunk_size: int = 64 * 1024 * 1024
+    ):
+        """
+        Only events of types given are recorded, or all events if
+        types not specified.
+        """
+        self.path = path
+        self.types = set(types) if types else None
+        self.chunk_size = chunk_size
+
+        self.lock = Lock()
+        self.file = open(path, "a+b")
+        self.mmap = None
+        self.size = 0
+        self.offset = 0
+        self.count = 0
+
+        self._map(max(os.path.getsize(path), chunk_size))
+        self.offset = self._find_end()
+
+    def _map(self, size: int):
+        """
+        Resize file and map it into memory.
+        """
+        if self.mmap:
+            self.mmap.flush()
+            self.mmap.close()
+
+        self.file.truncate(size)
+        self.mmap = mmap.mmap(self.file.fileno(), size)
+        self.size = size
+
+    def _find_end(self):
+        """
+        Find end of existing records, so new ones are appended.
+        """
+        offset = 0
+        while offset + HEADER.size <= self.size:
+            timestamp, type_length, data_length = HEADER.unpack_from(
+                self.mmap, offset
+            )
+            if not timestamp:
+                break
+            offset += HEADER.size + type_length + data_length
+        return offset
+
+    def record(self, event: Event):
+        """
+        Append an event into journal. Can be registered as general
+        handler of event engine directly.
+        """
+        if self.types and event.type not in self.types:
+            return
+
+        try:
+            data = pickle.dumps((event.topic, event.data), pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Data which cannot be pickled is not recorded.
+            return
+
+        type = event.type.encode("utf-8")
+        length = HEADER.size + len(type) + len(data)
+
+        with self.lock:
+            if not self.mmap:
+                return
+
+            # Leave room for zero header which marks the end.
+            if self.offset + length + HEADER.size > self.size:
+                grow = max(self.chunk_size, length + HEADER.size)
+                self._map(self.size + grow)
+
+            offset = self.offset
+            HEADER.pack_into(self.mmap, offset, time_ns(), len(type), len(data))
+            offset += HEADER.size
+            self.mmap[offset:offset + len(type)] = type
+            offset += len(type)
+            self.mmap[offset:offset + len(data)] = data
+
+            self.offset = offset + len(data)
+            self.count += 1
+
+    def flush(self):
+        """
+        Flush records in memory into disk.
+        """
+        with self.lock:
+            if self.mmap:
+                self.mmap.flush()
+
+    def close(self):
+        """
+        Flush records and truncate unused preallocated space.
+        """
+        with self.lock:
+            if not self.mmap:
+                return
+
+            self.mmap.flush()
+            self.mmap.close()
+            self.mmap = None
+
+            self.file.truncate(self.offset)
+            self.file.close()
+
+
+def read_journal(path: str):
+    """
+    Iterate (timestamp in ns, event) recorded in journal file.
+    """
+    with open(path, "rb") as f:
+        size = os.path.getsize(path)
+        if not size:
+            return
+
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as m:
+            offset = 0
+            while offset + HEADER.size <= size:
+                timestamp, type_length, data_length = HEADER.unpack_from(m, offset)
+                if not timestamp:
+                    break
+                offset += HEADER.size
+
+                type = m[offset:offset + type_length].decode("utf-8")
+                offset += type_length
+
+                topic, data = pickle.loads(m[offset:offset + data_length])
+                offset += data_length
+
+                yield timestamp, Event(type, data, topic)
+
+
+def replay_journal(path: str, event_engine: EventEngine, speed: float = 0):
+    """
+    Feed events recorded in journal into event engine.
+
+    With speed 0 events are put as fast as possible, otherwise the
+    recorded intervals are replayed speed times faster than real time.
+    Return number of events replayed.
+
+    Scheduled callbacks (call_later, call_every, timer events) are
+    driven by journal time: before each event, callbacks due by its
+    timestamp are dispatched, so timer driven logic such as requoting
+    runs as often as it did when recorded. Recorded timer events are
+    skipped since the engine generates its own. Event engine is left
+    on journal time, call set_virtual_time(None) to switch back.
+    """
+    count = 0
+    start_timestamp = 0
+    start_time = 0
+
+    for timestamp, event in read_journal(path):
+        if event.type == EVENT_TIMER:
+            continue
+
+        event_engine.set_virtual_time(timestamp / 1_000_000_000)
+
+        if speed:
+            if not start_timestamp:
+                start_timestamp = timestamp
+                start_time = time_ns()
+
+            target = start_time + (timestamp - start_timestamp) / speed
+            wait = (target - time_ns()) / 1_000_000_000
+            if wait > 0:
+                sleep(wait)
+
+        event_engine.put(event)
+        count += 1
+
+    return count
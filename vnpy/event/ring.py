@@ -0,0 +1,123 @@
+"""
+Ring buffer in shared memory for passing messages between processes.
+"""
+
+import struct
+from multiprocessing import shared_memory
+from time import sleep
+
+# Header: total bytes written, total bytes read.
+HEADER = struct.Struct("<QQ")
+LENGTH = struct.Struct("<I")
+
+# Length of a record telling reader to wrap to start of buffer.
+WRAP = 0xFFFFFFFF
+
+
+class SharedRingBuffer:
+    """
+    Single producer, single consumer ring buffer of byte messages
+    stored in shared memory.
+
+    Producer and consumer each only update their own position in
+    header, so no lock is needed between processes. Create it with
+    create=True in one process, and open it by name in the other.
+    """
+
+    def __init__(self, name: str = None, size: int = 16 * 1024 * 1024, create: bool = False):
+        """"""
+        if create:
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=HEADER.size + size
+            )
+            HEADER.pack_into(self.shm.buf, 0, 0, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.name = self.shm.name
+        self.owner = create
+        self.buf = self.shm.buf
+        self.capacity = self.shm.size - HEADER.size
+
+    def put(self, data: bytes):
+        """
+        Write a message into buffer. Return False if there is not
+        enough free space.
+        """
+        buf = self.buf
+        capacity = self.capacity
+        written, read = HEADER.unpack_from(buf, 0)
+
+        length = LENGTH.size + len(data)
+        position = written % capacity
+        tail = capacity - position
+
+        # Message is never split, skip the tail if it does not fit.
+        skip = tail if tail < length else 0
+        if written + skip + length - read > capacity:
+            return False
+
+        if skip:
+            if tail >= LENGTH.size:
+                LENGTH.pack_into(buf, HEADER.size + position, WRAP)
+            written += skip
+            position = 0
+
+        start = HEADER.size + position
+        LENGTH.pack_into(buf, start, len(data))
+        start += LENGTH.size
+        buf[start:start + len(data)] = data
+
+        # Publish new position only after message is fully written.
+        struct.pack_into("<Q", buf, 0, written + length)
+        return True
+
+    def get(self):
+        """
+        Read a message from buffer. Return None if buffer is empty.
+        """
+        buf = self.buf
+        capacity = self.capacity
+        written, read = HEADER.unpack_from(buf, 0)
+
+        if read == written:
+            return None
+
+        position = read % capacity
+        tail = capacity - position
+
+        if tail < LENGTH.size or LENGTH.unpack_from(buf, HEADER.size + position)[0] == WRAP:
+            read += tail
+            position = 0
+
+        start = HEADER.size + position
+        length = LENGTH.unpack_from(buf, start)[0]
+        start += LENGTH.size
+        data = bytes(buf[start:start + length])
+
+        struct.pack_into("<Q", buf, 8, read + LENGTH.size + length)
+        return data
+
+    def wait_get(self, timeout: float = 1, poll_interval: float = 0.0005):
+        """
+        Wait until a message is available or timeout.
+        """
+        data = self.get()
+        waited = 0
+
+        while data is None and waited < timeout:
+            sleep(poll_interval)
+            waited += poll_interval
+            data = self.get()
+
+        return data
+
+    def close(self):
+        """
+        Close shared memory, and destroy it if created by this object.
+        """
+        self.buf = None
+        self.shm.close()
+
+        if self.owner:
+            self.shm.unlink()
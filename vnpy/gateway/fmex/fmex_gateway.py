@@ -6,18 +6,18 @@ import sys
 import re
 import time
 import base64
+import binascii
 import json
-from copy import copy
 from datetime import datetime, timedelta
 from threading import Lock
-from urllib.parse import urlencode
+from urllib.parse import quote_plus
 
 from requests import ConnectionError
 
 from vnpy.event import Event
-from vnpy.api.rest import Request, RestClient
+from vnpy.api.rest import Request, RequestPriority, RestClient
+from vnpy.api.rest.rate_limit import TokenBucket
 from vnpy.api.websocket_fmex import WebsocketClient
-from vnpy.trader.event import EVENT_TIMER
 from vnpy.trader.constant import (
     Direction,
     Exchange,
@@ -27,9 +27,14 @@ from vnpy.trader.constant import (
     Offset,
     Interval
 )
+from vnpy.trader.event import EVENT_TICK, EVENT_FEED_LATENCY
 from vnpy.trader.gateway import BaseGateway, LocalOrderManager
+from vnpy.trader.latency import FeedLatency
+from vnpy.trader.orderbook import OrderBook
+from vnpy.trader.tradeflow import TradeAggregator
 from vnpy.trader.object import (
     TickData,
+    DepthTickData,
     OrderData,
     TradeData,
     PositionData,
@@ -48,6 +53,31 @@ WEBSOCKET_HOST = "wss://api.fmex.com/v2/ws"
 TESTNET_REST_HOST = "https://api.testnet.fmex.com"
 TESTNET_WEBSOCKET_HOST = "wss://api.testnet.fmex.com/v2/ws"
 
+# Authenticated websocket topics pushing order updates and fills
+ORDER_TOPIC = "user.orders"
+TRADE_TOPIC = "user.trades"
+
+# Client side budget of each endpoint class as (requests, seconds),
+# updated by X-RateLimit headers when server returns them.
+RATE_LIMITS = {
+    "order": (100, 10),
+    "cancel": (100, 10),
+    "query": (100, 10),
+}
+
+# Tokens below which requests are shed. Cancels are never shed.
+RATE_LIMIT_RESERVE = {
+    "order": 0,
+    "query": 20,
+}
+
+# Characters changed by form encoding, values without them are signed as is.
+UNSAFE_FORM_CHAR = re.compile(r"[^A-Za-z0-9_.\-~]").search
+
+# Open order query interval while private stream is down or authorized
+POLL_INTERVAL = 1
+RECONCILE_INTERVAL = 30
+
 STATUS_FMEX2VT = {
     "PENDING": Status.NOTTRADED,
     "pending": Status.NOTTRADED,
@@ -94,13 +124,16 @@ class FmexGateway(BaseGateway):
         super(FmexGateway, self).__init__(event_engine, "FMEX")
 
         self.order_manager = LocalOrderManager(self)
+        self.feed_latency = FeedLatency()
 
         self.rest_api = FmexRestApi(self)
         self.ws_api = FmexWebsocketApi(self)
 
-        self.heartbeat_count = 0
-
-        event_engine.register(EVENT_TIMER, self.process_timer_event)
+        self.query_timer = None
+        self.query_interval = 0
+        self.heartbeat_timer = None
+        self.stale_timer = None
+        self.latency_timer = None
 
     def connect(self, setting: dict):
         """"""
@@ -110,6 +143,10 @@ class FmexGateway(BaseGateway):
         server = setting["服务器"]
         proxy_host = setting["代理地址"]
         proxy_port = setting["代理端口"]
+        depth_level = setting.get("深度档位", "L20")
+        depth_connections = int(setting.get("深度连接数", 1))
+        latency_interval = int(setting.get("延迟统计间隔", 60))
+        latency_sample = int(setting.get("延迟采样间隔", 16))
 
         if proxy_port.isdigit():
             proxy_port = int(proxy_port)
@@ -119,9 +156,48 @@ class FmexGateway(BaseGateway):
         self.rest_api.connect(key, secret, session_number,
                               server, proxy_host, proxy_port)
 
+        self.ws_api.depth_level = depth_level
+        self.ws_api.depth_connections = depth_connections
         self.ws_api.connect(key, secret, server, proxy_host, proxy_port)
         # websocket will push all account status on connected, including asset, position and orders.
 
+        self.set_query_interval(POLL_INTERVAL)
+        self.heartbeat_timer = self.event_engine.call_every(
+            10, self.ws_api.heartbeat
+        )
+        self.stale_timer = self.event_engine.call_every(
+            1, self.ws_api.check_stale
+        )
+
+        # Latency is recorded for one of every latency_sample depth
+        # messages, and not at all if statistics are turned off.
+        if not latency_interval:
+            latency_sample = 0
+        self.feed_latency.sample_every = latency_sample
+
+        if latency_sample:
+            self.event_engine.register(EVENT_TICK, self.process_tick_event)
+        if latency_interval:
+            self.latency_timer = self.event_engine.call_every(
+                latency_interval, self.push_feed_latency
+            )
+
+    def set_query_interval(self, interval: int):
+        """
+        Change open order query cadence. Polling runs fast while private
+        stream is unavailable and slows down to reconciliation once
+        order updates are pushed by websocket.
+        """
+        if interval == self.query_interval:
+            return
+        self.query_interval = interval
+
+        if self.query_timer:
+            self.query_timer.cancel()
+        self.query_timer = self.event_engine.call_every(
+            interval, self.rest_api.query_open_order
+        )
+
     def subscribe(self, req: SubscribeRequest):
         """"""
         self.ws_api.subscribe(req)
@@ -130,6 +206,48 @@ class FmexGateway(BaseGateway):
         """"""
         return self.rest_api.send_order(req)
 
+    def get_order_book(self, symbol: str):
+        """
+        Get full depth order book of a subscribed symbol.
+        """
+        return self.ws_api.books.get(symbol, None)
+
+    def get_rate_limit(self):
+        """
+        Get remaining REST request budget of order, cancel and query.
+        """
+        return self.rest_api.get_rate_limit()
+
+    def get_trade_flow(self, symbol: str):
+        """
+        Get rolling market trade statistics of a subscribed symbol.
+        """
+        return self.ws_api.trade_flows.get(symbol, None)
+
+    def get_feed_stats(self):
+        """
+        Get depth win rate and lag of each market data connection.
+        """
+        return self.ws_api.get_feed_stats()
+
+    def get_feed_latency(self, topic: str = None):
+        """
+        Get feed latency percentiles (in microseconds) of each stage,
+        of a topic or of all topics.
+        """
+        return self.feed_latency.get_latency(topic)
+
+    def push_feed_latency(self):
+        """"""
+        self.on_event(EVENT_FEED_LATENCY, self.feed_latency.get_latency())
+
+    def process_tick_event(self, event: Event):
+        """
+        Measure delay from depth dispatch to tick handlers.
+        """
+        tick = event.data
+        self.feed_latency.record_handler(tick.vt_symbol, tick, time.time())
+
     def cancel_order(self, req: CancelRequest):
         """"""
         self.rest_api.cancel_order(req)
@@ -148,17 +266,20 @@ class FmexGateway(BaseGateway):
 
     def close(self):
         """"""
+        # Stop REST first so no query is sent during shutdown, and stop
+        # websocket before cancelling timers, since its disconnect
+        # callback resets query timer.
         self.rest_api.stop()
         self.ws_api.stop()
 
-    def process_timer_event(self, event: Event):
-        """"""
-        self.rest_api.query_open_order()
-
-        self.heartbeat_count += 1
-        if self.heartbeat_count == 10:
-            self.ws_api.heartbeat()
-            self.heartbeat_count = 0
+        if self.query_timer:
+            self.query_timer.cancel()
+        if self.heartbeat_timer:
+            self.heartbeat_timer.cancel()
+        if self.stale_timer:
+            self.stale_timer.cancel()
+        if self.latency_timer:
+            self.latency_timer.cancel()
 
 class FmexRestApi(RestClient):
     """
@@ -177,16 +298,22 @@ class FmexRestApi(RestClient):
         self.secret = ""
         self.REST_HOST = ""
 
+        # Precomputed by prepare_sign
+        self.hmac = None
+        self.header_template = {}
+        self.encode_json = json.JSONEncoder().encode
+
         self.orders = {}
         self.order_count = 1_000_000
         self.order_count_lock = Lock()
 
         self.connect_time = 0
 
-        # Use 60 by default, and will update after first request
-        self.rate_limit_limit = 60
-        self.rate_limit_remaining = 60
-        self.rate_limit_sleep = 0
+        self.rate_limits = {
+            endpoint: TokenBucket(capacity, period)
+            for endpoint, (capacity, period) in RATE_LIMITS.items()
+        }
+        self.shed_count = 0
 
     def connect(
         self,
@@ -216,7 +343,11 @@ class FmexRestApi(RestClient):
             self.init(TESTNET_REST_HOST, proxy_host, proxy_port)
             self.host, _ = _split_url(TESTNET_REST_HOST)
 
-        self.start(session_number)
+        self.prepare_sign()
+        self.reset_rate_limit()
+        self.start(int(session_number))
+        # No request added yet, so all sessions can be probed.
+        self.warm_sessions("/v2/public/server-time", keep=0)
 
         self.gateway.write_log("REST API启动成功")
 
@@ -225,64 +356,87 @@ class FmexRestApi(RestClient):
         self.query_open_order()
 
 
+    def prepare_sign(self):
+        """
+        Precompute HMAC key state and headers shared by all requests.
+        """
+        self.hmac = hmac.new(self.secret.encode(), digestmod=hashlib.sha1)
+        self.header_template = {
+            "FC-ACCESS-KEY": self.key,
+            "Content-Type": "application/json",
+        }
+
     def sign(self, request):
         """
         Generate FCOIN signature.
         """
         timestamp = str(int(time.time() * 1000))
-        _PATH = request.path
+        path = request.path
 
         if request.params:
-            param = ''
-            sort_pay = sorted(request.params.items())
-            for k in sort_pay:
-                param += '&' + str(k[0]) + '=' + str(k[1])
-            param = param.lstrip('&')
-            _PATH += param
-
-        POST_URL = ''
-        if request.data:
-            POST_URL = urlencode(sorted(request.data.items()))
-            request.data = json.dumps(request.data)
-
-        msg = request.method + self.REST_HOST + _PATH + timestamp + POST_URL
-        msg = base64.b64encode(msg.encode(encoding='utf-8'))
-
-        signature = hmac.new(self.secret.encode(), msg, digestmod=hashlib.sha1).digest()
-        signature = base64.b64encode(signature).decode('utf-8')
-
-        request.headers = {
-        'FC-ACCESS-TIMESTAMP' : timestamp,
-        'FC-ACCESS-KEY' : self.key,
-        'FC-ACCESS-SIGNATURE' : signature,
-        "Content-Type" : "application/json"
-        }
+            path += "&".join(
+                f"{k}={v}" for k, v in sorted(request.params.items())
+            )
+
+        # Form encoded body is signed, JSON body is sent.
+        form = ""
+        data = request.data
+        if data:
+            form = "&".join(
+                f"{_form_quote(k)}={_form_quote(v)}"
+                for k, v in sorted(data.items())
+            )
+            request.data = self.encode_json(data)
+
+        msg = request.method + self.REST_HOST + path + timestamp + form
+        msg = binascii.b2a_base64(msg.encode(), newline=False)
+
+        h = self.hmac.copy()
+        h.update(msg)
+        signature = binascii.b2a_base64(h.digest(), newline=False).decode()
+
+        headers = self.header_template.copy()
+        headers["FC-ACCESS-TIMESTAMP"] = timestamp
+        headers["FC-ACCESS-SIGNATURE"] = signature
+        request.headers = headers
         return request
 
     def query_open_order(self):
         """查询挂单"""
+        # Query joining one in flight is not sent and costs no budget.
+        if (
+            not self.is_coalesced("open_order")
+            and not self.check_rate_limit("query")
+        ):
+            return
+
         self.add_request(
             method="GET",
             path="/v3/contracts/orders/open",
-            callback=self.on_open_order
+            callback=self.on_open_order,
+            coalesce_key="open_order",
         )
 
     def on_open_order(self, data, request):
         """"""
+        self.update_rate_limit(request)
+
         if len(data["data"]['results']) == 0:
-            self.gateway.on_empty_open_order()
+            self.gateway.on_empty_open_order(request.sequence)
         orders = {}
         for d in data["data"]['results']:
             order = self.on_single_order(d)
             #self.gateway.on_order(order)
             orders[order.vt_orderid] = order
 
-        self.gateway.on_orders(orders)
+        self.gateway.on_orders(orders, request.sequence)
 
         self.gateway.write_log("挂单查询成功")
 
     def on_send_order(self, data, request):
         """"""
+        self.update_rate_limit(request)
+
         d = data['data']
         sys_orderid = d["id"]
         order = self.orders.get(sys_orderid, None)
@@ -296,16 +450,18 @@ class FmexRestApi(RestClient):
         sys_orderid = d["id"]
         order = self.orders.get(sys_orderid, None)
 
+        # Finished status is final, an older REST snapshot must not
+        # bring back an order already finished by websocket push.
+        if order and order.status and not order.is_active():
+            return order
+
         if not order:
             order_type = ORDERTYPE_FMEXX2VT[d["type"].upper()]
             direction = DIRECTION_FMEX2VT[d["direction"].upper()]
             dt = datetime.fromtimestamp(d["created_at"] / 1000)
             time = dt.strftime("%H:%M:%S")
 
-            if "symobol" in d.keys():
-                symbol = d["symbol"].upper()
-            else:
-                symbol = "BTCUSD_P"
+            symbol = d["symbol"].upper()
 
             status = STATUS_FMEX2VT.get(d["status"], None)
             order = OrderData(
@@ -360,6 +516,9 @@ class FmexRestApi(RestClient):
 
     def query_account_balance(self):
         """"""
+        if not self.check_rate_limit("query"):
+            return
+
         self.add_request(
             method="GET",
             path="/v3/contracts/accounts",
@@ -368,6 +527,8 @@ class FmexRestApi(RestClient):
 
     def on_query_account_balance(self, data, request):
         """"""
+        self.update_rate_limit(request)
+
         for k,v in data["data"].items():
             account = AccountData(
                 accountid= k,
@@ -382,6 +543,10 @@ class FmexRestApi(RestClient):
 
     def send_order(self, req: OrderRequest):
         """"""
+        if not self.check_rate_limit("order"):
+            self.gateway.write_log("委托被限速丢弃")
+            return ""
+
         local_orderid = 1111111
 
         order = req.create_order_data(local_orderid, self.gateway_name)
@@ -411,6 +576,7 @@ class FmexRestApi(RestClient):
             extra=order,
             on_failed=self.on_send_order_failed,
             on_error=self.on_send_order_error,
+            priority=RequestPriority.order,
         )
 
         #
@@ -418,15 +584,20 @@ class FmexRestApi(RestClient):
 
     def cancel_order(self, req: CancelRequest):
         """"""
+        self.check_rate_limit("cancel")
+
         self.add_request(
             "POST",
             f"/v3/contracts/orders/{req.sysordid}/cancel",
             callback=self.on_cancel_order,
             on_error=self.on_cancel_order_error,
+            priority=RequestPriority.cancel,
         )
 
     def on_cancel_order(self, data, request):
         """Websocket will push a new order status"""
+        self.update_rate_limit(request)
+
         d = data['data']
         order = self.on_single_order(d)
         self.gateway.on_order(order)
@@ -486,6 +657,8 @@ class FmexRestApi(RestClient):
         """
         Callback to handle request failed.
         """
+        self.update_rate_limit(request)
+
         data = request.response.json()
         msg = f"请求失败，状态码：{status_code} {data}"
         self.gateway.write_log(msg)
@@ -503,23 +676,72 @@ class FmexRestApi(RestClient):
             self.exception_detail(exception_type, exception_value, tb, request)
         )
 
+    def get_endpoint(self, request: Request):
+        """
+        Get rate limit class of a request.
+        """
+        if request.path.endswith("/cancel"):
+            return "cancel"
+        elif request.method == "POST":
+            return "order"
+        else:
+            return "query"
+
     def update_rate_limit(self, request: Request):
         """
         Update current request limit remaining status.
         """
-        pass
+        response = request.response
+        if response is None:
+            return
+
+        bucket = self.rate_limits[self.get_endpoint(request)]
+
+        if response.status_code == 429:
+            bucket.update(remaining=0)
+            return
+
+        headers = response.headers
+        limit = headers.get("X-RateLimit-Limit", None)
+        remaining = headers.get("X-RateLimit-Remaining", None)
+
+        if limit or remaining:
+            bucket.update(
+                int(limit) if limit else 0,
+                int(remaining) if remaining else None
+            )
 
     def reset_rate_limit(self):
         """
-        Reset request limit remaining every 1 second.
+        Refill budget of all endpoint classes.
         """
-        pass
+        for bucket in self.rate_limits.values():
+            bucket.reset()
 
-    def check_rate_limit(self):
+    def check_rate_limit(self, endpoint: str):
         """
         Check if rate limit is reached before sending out requests.
+        Return False if request should be shed.
         """
-        pass
+        bucket = self.rate_limits[endpoint]
+
+        if endpoint == "cancel":
+            return bucket.consume(force=True)
+
+        if bucket.consume(RATE_LIMIT_RESERVE[endpoint]):
+            return True
+
+        self.shed_count += 1
+        return False
+
+    def get_rate_limit(self):
+        """
+        Get remaining request budget of each endpoint class.
+        """
+        return {
+            endpoint: bucket.remaining
+            for endpoint, bucket in self.rate_limits.items()
+        }
 
 
 class FmexWebsocketApi(WebsocketClient):
@@ -538,6 +760,32 @@ class FmexWebsocketApi(WebsocketClient):
         self.callbacks = {}
 
         self.ticks = {}
+        self.books = {}
+        self.trade_flows = {}
+
+        # Market data topics of all subscribed symbols, replayed on hello
+        self.topics = []
+        self.topic_lock = Lock()
+        self.topic_ready = False
+
+        # Books are invalidated when depth stream is interrupted, until
+        # next snapshot arrives.
+        self.stale_timeout = 5          # seconds
+        self.stale_symbols = set()
+        self.depth_ts = {}
+        self.depth_received = {}
+
+        # Depth topic level: L20, L150 or full
+        self.depth_level = "L20"
+
+        # Redundant connections subscribing the same depth topics, the
+        # first copy of each snapshot (by exchange ts) is published.
+        self.depth_connections = 1
+        self.mirrors = []
+        self.depth_lock = Lock()
+        self.name = "ws0"
+        self.feed_stats = {self.name: FeedStats()}
+        self.feed_latency = gateway.feed_latency
 
     def connect(
         self, key: str, secret: str, server: str, proxy_host: str, proxy_port: int
@@ -547,12 +795,28 @@ class FmexWebsocketApi(WebsocketClient):
         self.secret = secret.encode()
 
         if server == "REAL":
-            self.init(WEBSOCKET_HOST, proxy_host, proxy_port)
+            host = WEBSOCKET_HOST
         else:
-            self.init(TESTNET_WEBSOCKET_HOST, proxy_host, proxy_port)
+            host = TESTNET_WEBSOCKET_HOST
 
+        self.init(host, proxy_host, proxy_port)
         self.start()
 
+        for i in range(1, self.depth_connections):
+            name = f"ws{i}"
+            self.feed_stats[name] = FeedStats()
+
+            mirror = FmexDepthMirror(self, name)
+            mirror.init(host, proxy_host, proxy_port)
+            mirror.start()
+            self.mirrors.append(mirror)
+
+    def stop(self):
+        """"""
+        for mirror in self.mirrors:
+            mirror.stop()
+        super().stop()
+
     def subscribe(self, req: SubscribeRequest):
         """
         Subscribe to tick data upate.
@@ -566,7 +830,28 @@ class FmexWebsocketApi(WebsocketClient):
         )
         self.ticks[req.symbol] = tick
 
+        book = OrderBook(req.symbol, req.exchange, self.gateway_name)
+        self.books[req.symbol] = book
+
+        trade_flow = TradeAggregator(req.symbol, req.exchange, self.gateway_name)
+        self.trade_flows[req.symbol] = trade_flow
+
+        name = req.symbol.lower()
+        topics = [
+            f"depth.{self.depth_level}.{name}",
+            f"ticker.{name}",
+            f"trade.{name}",
+        ]
 
+        # Before hello arrives, topics are batched into one sub command
+        # sent by subscribe_topic.
+        with self.topic_lock:
+            self.topics.extend(t for t in topics if t not in self.topics)
+            if self.topic_ready:
+                self.send_packet({"cmd": "sub", "args": topics})
+
+        for mirror in self.mirrors:
+            mirror.subscribe_topic(topics[:1])
 
     def on_connected(self):
         """"""
@@ -575,32 +860,61 @@ class FmexWebsocketApi(WebsocketClient):
     def on_disconnected(self):
         """"""
         self.gateway.write_log("Websocket API连接断开")
+        with self.topic_lock:
+            self.topic_ready = False
+
+        # Private order stream only runs on this connection.
+        self.gateway.set_query_interval(POLL_INTERVAL)
+
+        # Depth keeps flowing while any redundant connection is alive.
+        if any(mirror.topic_ready for mirror in self.mirrors):
+            return
+
+        with self.depth_lock:
+            for symbol in list(self.books):
+                self.mark_stale(symbol, "连接断开")
 
     def on_packet(self, packet: dict):
         """"""
-        if packet['type'] == "hello":
+        type_ = packet['type']
+
+        if type_ == "hello":
             self.gateway.write_log("Websocket API验证授权成功")
+            self.login()
             self.subscribe_topic()
 
-        elif 'ticker' in packet['type']:
+        elif type_ == "auth":
+            self.on_login(packet)
+
+        elif type_.startswith(ORDER_TOPIC):
+            self.on_user_order(packet)
+
+        elif type_.startswith(TRADE_TOPIC):
+            self.on_user_trade(packet)
+
+        elif type_.startswith("ticker."):
             self.on_ticker(packet)
 
-        elif 'depth' in packet['type']:
+        elif type_.startswith("depth."):
             self.on_depth(packet)
 
+        elif type_.startswith("trade."):
+            self.on_trade(packet)
+
     def on_ticker(self, d):
         """"""
-        symbol = d['type'].split('.')[-1]
+        symbol = d['type'].split('.')[-1].upper()
         tick = self.ticks.get(symbol, None)
 
         if not tick:
             return
 
         ticker = d['ticker']
-        tick.open = ticker[6]
-        tick.high = ticker[7]
-        tick.low = ticker[8]
         tick.last_price = ticker[0]
+        tick.last_volume = ticker[1]
+        tick.open_price = ticker[6]
+        tick.high_price = ticker[7]
+        tick.low_price = ticker[8]
         tick.volume = ticker[9]
 
     def on_error(self, exception_type: type, exception_value: Exception, tb):
@@ -613,75 +927,301 @@ class FmexWebsocketApi(WebsocketClient):
 
     def subscribe_topic(self):
         """
-        Subscribe to all private topics.
+        Subscribe to market data topics of all subscribed symbols.
+        """
+        with self.topic_lock:
+            self.topic_ready = True
+            if self.topics:
+                self.send_packet({"cmd": "sub", "args": self.topics})
+
+    def login(self):
         """
-        req = {"cmd": "sub", "args": ["depth.L20.btcusd_p"]}
+        Authorize connection for private order and trade topics.
+        """
+        timestamp = str(int(time.time() * 1000))
+        msg = base64.b64encode(("GET" + self.host + timestamp).encode())
+        signature = hmac.new(self.secret, msg, digestmod=hashlib.sha1).digest()
+        signature = base64.b64encode(signature).decode()
+
+        req = {
+            "cmd": "auth",
+            "args": [self.key, timestamp, signature],
+            "id": "auth"
+        }
+        self.send_packet(req)
+
+    def on_login(self, packet: dict):
+        """"""
+        if packet.get("status", 0):
+            self.gateway.write_log(f"Websocket API私有推送验证失败：{packet}")
+            return
+
+        self.gateway.write_log("Websocket API私有推送验证成功")
+        req = {"cmd": "sub", "args": [ORDER_TOPIC, TRADE_TOPIC]}
         self.send_packet(req)
 
+        # Updates may be missed while disconnected, reconcile once with
+        # REST snapshot and then only poll at low cadence.
+        self.gateway.rest_api.query_open_order()
+        self.gateway.set_query_interval(RECONCILE_INTERVAL)
+
+    def on_user_order(self, d):
+        """
+        Incremental order update pushed by private topic.
+        """
+        order = self.gateway.rest_api.on_single_order(d["data"])
+        self.gateway.on_order(order)
+
+    def on_user_trade(self, d):
+        """
+        Order fill pushed by private topic.
+        """
+        d = d["data"]
+        sys_orderid = d["order_id"]
+        dt = datetime.fromtimestamp(d["created_at"] / 1000)
+
+        trade = TradeData(
+            symbol=d["symbol"].upper(),
+            exchange=Exchange.FMEX,
+            orderid=sys_orderid,
+            tradeid=d["id"],
+            direction=DIRECTION_FMEX2VT[d["direction"].upper()],
+            price=d["price"],
+            volume=d["quantity"],
+            time=dt.strftime("%H:%M:%S"),
+            gateway_name=self.gateway_name,
+        )
+        self.gateway.on_trade(trade)
+
+    def mark_stale(self, symbol: str, reason: str):
+        """
+        Invalidate local book and notify strategies to stop quoting.
+        """
+        if symbol in self.stale_symbols:
+            return
+        self.stale_symbols.add(symbol)
+
+        book = self.books[symbol]
+        book.clear()
+
+        self.gateway.write_log(f"行情数据失效：{symbol} {reason}")
+        self.gateway.on_market_stale(book.vt_symbol, True, reason)
+
+    def get_feed_stats(self):
+        """"""
+        return {name: stats.to_dict() for name, stats in self.feed_stats.items()}
+
+    def check_stale(self):
+        """
+        Check depth update timeout of all subscribed symbols, and move
+        trade windows forward when no trade is pushed.
+        """
+        now = time.time()
+        for trade_flow in list(self.trade_flows.values()):
+            trade_flow.advance()
+
+        with self.depth_lock:
+            for symbol, received in list(self.depth_received.items()):
+                if now - received > self.stale_timeout:
+                    self.mark_stale(symbol, "深度数据超时")
+
     def heartbeat(self):
         timestamp = int(time.time())
         req = {"cmd":"ping","args":[timestamp],"id":"coray1912"}
         self.send_packet(req)
 
-    def on_depth(self, d):
+        for mirror in self.mirrors:
+            mirror.send_packet(req)
+
+    def on_depth(self, d, client: WebsocketClient = None):
+        """
+        Process depth snapshot received by client (self by default).
+        """
+        with self.depth_lock:
+            self.process_depth(d, client or self)
+
+    def process_depth(self, d, client: WebsocketClient):
         """"""
         symbol = d['type'].split('.')[-1].upper()
         tick = self.ticks.get(symbol, None)
         if not tick:
             return
 
+        stats = self.feed_stats[client.name]
+        stats.received += 1
+
+        # Drop duplicated or out of order snapshot, e.g. copy from slower
+        # connection or replay after reconnect.
+        ts = d["ts"]
+        last_ts = self.depth_ts.get(symbol, 0)
+        if ts <= last_ts:
+            if ts == last_ts:
+                stats.add_lag(time.time() - self.depth_received[symbol])
+            return
+        stats.wins += 1
+
+        self.depth_ts[symbol] = ts
+        self.depth_received[symbol] = time.time()
+
         bids = d["bids"]
         asks = d["asks"]
 
-        tick.bid_price_1 = bids[0]
-        tick.bid_price_2 = bids[2]
-        tick.bid_price_3 = bids[4]
-        tick.bid_price_4 = bids[6]
-        tick.bid_price_5 = bids[8]
-        tick.bid_price_6 = bids[10]
-        tick.bid_price_7 = bids[12]
-        tick.bid_price_8 = bids[14]
-        tick.bid_price_9 = bids[16]
-        tick.bid_price_10 = bids[18]
-        tick.bid_volume_1 = bids[1]
-        tick.bid_volume_2 = bids[3]
-        tick.bid_volume_3 = bids[5]
-        tick.bid_volume_4 = bids[7]
-        tick.bid_volume_5 = bids[9]
-        tick.bid_volume_6 = bids[11]
-        tick.bid_volume_7 = bids[13]
-        tick.bid_volume_8 = bids[15]
-        tick.bid_volume_9 = bids[17]
-        tick.bid_volume_10 = bids[19]
-
-        tick.ask_price_1 = asks[0]
-        tick.ask_price_2 = asks[2]
-        tick.ask_price_3 = asks[4]
-        tick.ask_price_4 = asks[6]
-        tick.ask_price_5 = asks[8]
-        tick.ask_price_6 = asks[10]
-        tick.ask_price_7 = asks[12]
-        tick.ask_price_8 = asks[14]
-        tick.ask_price_9 = asks[16]
-        tick.ask_price_10 = asks[18]
-        tick.ask_volume_1 = asks[1]
-        tick.ask_volume_2 = asks[3]
-        tick.ask_volume_3 = asks[5]
-        tick.ask_volume_4 = asks[7]
-        tick.ask_volume_5 = asks[9]
-        tick.ask_volume_6 = asks[11]
-        tick.ask_volume_7 = asks[13]
-        tick.ask_volume_8 = asks[15]
-        tick.ask_volume_9 = asks[17]
-        tick.ask_volume_10 = asks[19]
-        tick.datetime = datetime.fromtimestamp(d['ts'] / 1000)
-
-        self.gateway.on_tick(copy(tick))
+        book = self.books[symbol]
+        book.update_snapshot(bids, asks, timestamp=ts)
+
+        if symbol in self.stale_symbols:
+            self.stale_symbols.discard(symbol)
+            self.gateway.on_market_stale(book.vt_symbol, False)
+
+        # New snapshot owns lists decoded from message, no copy needed.
+        depth_tick = DepthTickData(
+            symbol=tick.symbol,
+            exchange=tick.exchange,
+            gateway_name=self.gateway_name,
+            bids=bids,
+            asks=asks,
+            timestamp=d["ts"],
+            name=tick.name,
+            volume=tick.volume,
+            last_price=tick.last_price,
+            last_volume=tick.last_volume,
+            open_price=tick.open_price,
+            high_price=tick.high_price,
+            low_price=tick.low_price,
+        )
+
+        feed_latency = self.feed_latency
+        if feed_latency.sample():
+            topic = d["type"]
+            dispatched = time.time()
+            feed_latency.record(
+                topic, ts / 1000, client.received_time, client.parsed_time, dispatched
+            )
+            feed_latency.record_dispatch(
+                depth_tick.vt_symbol, depth_tick, topic, dispatched
+            )
+
+        self.gateway.on_tick(depth_tick)
 
 
     def on_trade(self, d):
+        """
+        Market trade pushed by trade topic, side is taker direction.
+        """
+        symbol = d['type'].split('.')[-1].upper()
+        trade_flow = self.trade_flows.get(symbol, None)
+        if not trade_flow:
+            return
+
+        if d["side"] == "sell":
+            direction = Direction.SHORT
+        else:
+            direction = Direction.LONG
+
+        trade_flow.update(d["ts"], d["price"], d["amount"], direction)
+
+class FmexDepthMirror(WebsocketClient):
+    """
+    Redundant connection forwarding depth snapshots to FmexWebsocketApi.
+    """
+
+    def __init__(self, ws_api: FmexWebsocketApi, name: str):
         """"""
-        pass
+        super(FmexDepthMirror, self).__init__()
+
+        self.ws_api = ws_api
+        self.gateway = ws_api.gateway
+        self.name = name
+
+        self.topic_lock = Lock()
+        self.topic_ready = False
+
+    def subscribe_topic(self, topics: list = None):
+        """
+        Subscribe to depth topics of primary connection, or only given
+        topics of a new symbol.
+        """
+        with self.topic_lock:
+            if topics is None:
+                self.topic_ready = True
+                topics = [
+                    t for t in self.ws_api.topics if t.startswith("depth.")
+                ]
+            elif not self.topic_ready:
+                return
+
+            if topics:
+                self.send_packet({"cmd": "sub", "args": topics})
+
+    def on_connected(self):
+        """"""
+        self.gateway.write_log(f"Websocket深度连接{self.name}成功")
+
+    def on_disconnected(self):
+        """"""
+        self.gateway.write_log(f"Websocket深度连接{self.name}断开")
+        with self.topic_lock:
+            self.topic_ready = False
+
+    def on_packet(self, packet: dict):
+        """"""
+        type_ = packet["type"]
+
+        if type_ == "hello":
+            self.subscribe_topic()
+
+        elif type_.startswith("depth."):
+            self.ws_api.on_depth(packet, self)
+
+    def on_error(self, exception_type: type, exception_value: Exception, tb):
+        """"""
+        self.ws_api.on_error(exception_type, exception_value, tb)
+
+
+class FeedStats:
+    """
+    Depth arrival statistics of one market data connection.
+    """
+
+    def __init__(self):
+        """"""
+        self.received = 0
+        self.wins = 0
+        self.lag_count = 0
+        self.lag_total = 0
+        self.lag_max = 0
+
+    def add_lag(self, lag: float):
+        """
+        Record delay behind the winning copy of a snapshot.
+        """
+        self.lag_count += 1
+        self.lag_total += lag
+        if lag > self.lag_max:
+            self.lag_max = lag
+
+    def to_dict(self):
+        """
+        Win rate and lag (in milliseconds) summary.
+        """
+        return {
+            "received": self.received,
+            "wins": self.wins,
+            "win_rate": self.wins / self.received if self.received else 0,
+            "lag_avg": self.lag_total / self.lag_count * 1000 if self.lag_count else 0,
+            "lag_max": self.lag_max * 1000,
+        }
+
+
+def _form_quote(value):
+    """
+    Form encode a value, same as urlencode but skipping safe strings.
+    """
+    value = str(value)
+    if UNSAFE_FORM_CHAR(value):
+        return quote_plus(value)
+    return value
+
 
 def _split_url(url):
     """
@@ -11,7 +11,7 @@ from queue import Empty, Queue
 from threading import Thread
 from typing import Any, Sequence, Type
 
-from vnpy.event import Event, EventEngine
+from vnpy.event import Event, EventEngine, LANE_BACKGROUND
 from .app import BaseApp
 from .event import (
     EVENT_TICK,
@@ -319,7 +319,9 @@ class LogEngine(BaseEngine):
 
     def register_event(self):
         """"""
-        self.event_engine.register(EVENT_LOG, self.process_log_event)
+        self.event_engine.register(
+            EVENT_LOG, self.process_log_event, LANE_BACKGROUND
+        )
         #self.event_engine.register(EVENT_ALGO_LOG, self.process_algo_log_event)
 
     def process_log_event(self, event: Event):
@@ -353,6 +355,9 @@ class OmsEngine(BaseEngine):
 
         self.active_orders = {}
 
+        # Sequence of last open orders snapshot applied
+        self.orders_sequence = 0
+
         self.add_function()
         self.register_event()
 
@@ -383,6 +388,16 @@ class OmsEngine(BaseEngine):
         self.event_engine.register(EVENT_ACCOUNT, self.process_account_event)
         self.event_engine.register(EVENT_CONTRACT, self.process_contract_event)
 
+        # Snapshots and incremental updates of orders must be applied
+        # in order by one thread, which also runs algo timers reading
+        # orders.
+        self.event_engine.pin_types([
+            EVENT_ORDER,
+            EVENT_ORDERS,
+            EVENT_EMPTY_OPEN_ORDER,
+            EVENT_TRADE,
+        ])
+
     def process_tick_event(self, event: Event):
         """"""
         tick = event.data
@@ -392,7 +407,11 @@ class OmsEngine(BaseEngine):
         """"""
         order = event.data
 
-        if not self.orders.get(order.vt_orderid, None):
+        # Orders dict holds open orders only, incremental updates from
+        # websocket remove finished orders before next snapshot arrives.
+        if not order.is_active():
+            self.orders.pop(order.vt_orderid, None)
+        elif not self.orders.get(order.vt_orderid, None):
             self.orders[order.vt_orderid] = order
 
         # If order is active, then update data in dict.
@@ -405,10 +424,26 @@ class OmsEngine(BaseEngine):
 
     def process_orders_event(self, event: Event):
         """"""
-        orders = event.data
-        self.orders = orders
-            
+        sequence, orders = event.data
+        if sequence < self.orders_sequence:
+            return
+        self.orders_sequence = sequence
+
+        # Snapshot may be queried before a finished order was pushed by
+        # websocket, keep only orders still active.
+        self.orders = {
+            vt_orderid: order
+            for vt_orderid, order in orders.items()
+            if order.is_active()
+        }
+
     def process_empty_open_order_event(self, event: Event):
+        """"""
+        sequence = event.data
+        if sequence < self.orders_sequence:
+            return
+        self.orders_sequence = sequence
+
         self.active_orders = {}
         self.orders = {}
 
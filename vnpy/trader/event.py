@@ -12,4 +12,6 @@ EVENT_EMPTY_OPEN_ORDER = "eZerder."
 EVENT_POSITION = "ePosition."
 EVENT_ACCOUNT = "eAccount."
 EVENT_CONTRACT = "eContract."
+EVENT_MARKET_STALE = "eMarketStale."
+EVENT_FEED_LATENCY = "eFeedLatency"
 EVENT_LOG = "eLog"
@@ -16,6 +16,7 @@ from .event import (
     EVENT_POSITION,
     EVENT_ACCOUNT,
     EVENT_CONTRACT,
+    EVENT_MARKET_STALE,
     EVENT_LOG,
 )
 from .object import (
@@ -83,11 +84,13 @@ class BaseGateway(ABC):
         self.event_engine = event_engine
         self.gateway_name = gateway_name
 
-    def on_event(self, type: str, data: Any = None):
+    def on_event(self, type: str, data: Any = None, topic: str = ""):
         """
         General event push.
+
+        Handlers registered to type + topic also receive the event.
         """
-        event = Event(type, data)
+        event = Event(type, data, topic)
         self.event_engine.put(event)
 
     def on_tick(self, tick: TickData):
@@ -95,53 +98,48 @@ class BaseGateway(ABC):
         Tick event push.
         Tick event of a specific vt_symbol is also pushed.
         """
-        self.on_event(EVENT_TICK, tick)
-        self.on_event(EVENT_TICK + tick.vt_symbol, tick)
+        self.on_event(EVENT_TICK, tick, tick.vt_symbol)
 
     def on_trade(self, trade: TradeData):
         """
         Trade event push.
         Trade event of a specific vt_symbol is also pushed.
         """
-        self.on_event(EVENT_TRADE, trade)
-        self.on_event(EVENT_TRADE + trade.vt_symbol, trade)
+        self.on_event(EVENT_TRADE, trade, trade.vt_symbol)
 
     def on_order(self, order: OrderData):
         """
         Order event push.
         Order event of a specific vt_orderid is also pushed.
         """
-        self.on_event(EVENT_ORDER, order)
-        self.on_event(EVENT_ORDER + order.vt_orderid, order)
+        self.on_event(EVENT_ORDER, order, order.vt_orderid)
 
-    def on_orders(self, orders: list):
+    def on_orders(self, orders: dict, sequence: int = 0):
         """
-        Order event push.
-        Order event of a specific vt_orderid is also pushed.
+        Open orders snapshot push, with data of (sequence, orders).
+        Snapshot with lower sequence than one already applied is stale.
         """
-        self.on_event(EVENT_ORDERS, orders)
+        self.on_event(EVENT_ORDERS, (sequence, orders))
 
-    def on_empty_open_order(self):
+    def on_empty_open_order(self, sequence: int = 0):
         """
-        Zero pending order event push.
+        Zero pending order event push, with data of sequence.
         """
-        self.on_event(EVENT_EMPTY_OPEN_ORDER, '')
+        self.on_event(EVENT_EMPTY_OPEN_ORDER, sequence)
 
     def on_position(self, position: PositionData):
         """
         Position event push.
         Position event of a specific vt_symbol is also pushed.
         """
-        self.on_event(EVENT_POSITION, position)
-        self.on_event(EVENT_POSITION + position.vt_symbol, position)
+        self.on_event(EVENT_POSITION, position, position.vt_symbol)
 
     def on_account(self, account: AccountData):
         """
         Account event push.
         Account event of a specific vt_accountid is also pushed.
         """
-        self.on_event(EVENT_ACCOUNT, account)
-        self.on_event(EVENT_ACCOUNT + account.vt_accountid, account)
+        self.on_event(EVENT_ACCOUNT, account, account.vt_accountid)
 
     def on_log(self, log: LogData):
         """
@@ -155,6 +153,14 @@ class BaseGateway(ABC):
         """
         self.on_event(EVENT_CONTRACT, contract)
 
+    def on_market_stale(self, vt_symbol: str, stale: bool, reason: str = ""):
+        """
+        Market data stale event push, with data dict of vt_symbol, stale
+        and reason. Pushed again with stale False after fresh snapshot.
+        """
+        data = {"vt_symbol": vt_symbol, "stale": stale, "reason": reason}
+        self.on_event(EVENT_MARKET_STALE, data, vt_symbol)
+
     def write_log(self, msg: str):
         """
         Write a log event from gateway.
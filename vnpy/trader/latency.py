@@ -0,0 +1,194 @@
+"""
+Latency histograms of market data feed, from exchange to handler.
+"""
+
+
+# Values keep SUB_BITS significant bits, which gives 128 sub buckets
+# per power of two and under 0.8% error.
+SUB_BITS = 8
+SUB_MASK = (1 << SUB_BITS) - 1
+
+FEED_STAGES = ("exchange", "parse", "dispatch", "handler")
+
+
+class LatencyHistogram:
+    """
+    HDR style histogram with log-linear buckets of microseconds.
+
+    Recording is O(1) and memory is bounded by the value range. Counts
+    are kept in a list indexed by bucket, grown on demand.
+    """
+
+    def __init__(self):
+        """"""
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, latency: float):
+        """
+        Record a latency in seconds. Negative value (clock skew between
+        exchange and local host) is kept in min but counted as zero.
+        """
+        if not self.count or latency < self.min:
+            self.min = latency
+        if latency > self.max:
+            self.max = latency
+        self.count += 1
+        self.total += latency
+
+        us = int(latency * 1_000_000)
+        if us < 0:
+            us = 0
+
+        shift = us.bit_length() - SUB_BITS
+        if shift > 0:
+            index = (shift << SUB_BITS) + (us >> shift)
+        else:
+            index = us
+
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+
+    def get_percentile(self, percent: float):
+        """
+        Get latency percentile in microseconds.
+        """
+        if not self.count:
+            return 0
+
+        target = percent / 100 * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= target:
+                break
+
+        shift = index >> SUB_BITS
+        if shift:
+            return (index & SUB_MASK) << shift
+        return index
+
+    def reset(self):
+        """"""
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def to_dict(self):
+        """
+        Get statistics with latency in microseconds.
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count * 1_000_000 if self.count else 0,
+            "min": self.min * 1_000_000,
+            "p50": self.get_percentile(50),
+            "p90": self.get_percentile(90),
+            "p99": self.get_percentile(99),
+            "p999": self.get_percentile(99.9),
+            "max": self.max * 1_000_000,
+        }
+
+
+class FeedLatency:
+    """
+    Latency of every feed message by topic, split into stages:
+
+    * exchange: exchange timestamp to local receive
+    * parse: receive to message decoded
+    * dispatch: decoded to event put into engine
+    * handler: event put to tick handler called
+
+    Only one of every sample_every messages is recorded, and nothing if
+    sample_every is 0. record must not be called by several threads at
+    the same time (gateway calls it under depth lock).
+    """
+
+    def __init__(self, sample_every: int = 16):
+        """"""
+        self.histograms = {}
+        self.sample_every = sample_every
+        self.sample_count = 0
+
+        # vt_symbol: (data, topic, dispatch time) of last dispatched
+        self.dispatched = {}
+
+    def sample(self):
+        """
+        Check if latency of current message should be recorded.
+        """
+        if not self.sample_every:
+            return False
+
+        self.sample_count += 1
+        return not self.sample_count % self.sample_every
+
+    def get_histograms(self, topic: str):
+        """"""
+        histograms = self.histograms.get(topic, None)
+        if not histograms:
+            histograms = {stage: LatencyHistogram() for stage in FEED_STAGES}
+            self.histograms[topic] = histograms
+        return histograms
+
+    def record(
+        self,
+        topic: str,
+        exchange_time: float,
+        received: float,
+        parsed: float,
+        dispatched: float,
+    ):
+        """
+        Record a message before dispatch, all times in seconds.
+        """
+        histograms = self.get_histograms(topic)
+        histograms["exchange"].record(received - exchange_time)
+        histograms["parse"].record(parsed - received)
+        histograms["dispatch"].record(dispatched - parsed)
+
+    def record_dispatch(self, vt_symbol: str, data: object, topic: str, dispatched: float):
+        """
+        Remember data pushed so that its handler delay can be recorded.
+        """
+        self.dispatched[vt_symbol] = (data, topic, dispatched)
+
+    def record_handler(self, vt_symbol: str, data: object, now: float):
+        """
+        Record handler delay if data was dispatched by record_dispatch.
+        Conflated data never reaches handler and is not recorded.
+        """
+        entry = self.dispatched.get(vt_symbol, None)
+        if not entry or entry[0] is not data:
+            return
+
+        self.get_histograms(entry[1])["handler"].record(now - entry[2])
+
+    def get_latency(self, topic: str = None):
+        """
+        Get latency summary of a topic, or of all topics if not given.
+        """
+        if topic:
+            topics = [topic] if topic in self.histograms else []
+        else:
+            topics = list(self.histograms)
+
+        return {
+            t: {
+                stage: histogram.to_dict()
+                for stage, histogram in self.histograms[t].items()
+            }
+            for t in topics
+        }
+
+    def reset(self):
+        """"""
+        self.histograms = {}
+        self.dispatched = {}
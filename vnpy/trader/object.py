@@ -94,6 +94,84 @@ class TickData(BaseData):
         self.vt_symbol = f"{self.symbol}.{self.exchange.value}"
 
 
+class DepthTickData(TickData):
+    """
+    Tick data with orderbook snapshot kept in flat price/volume lists
+    ([price, volume, price, volume...]) as pushed by exchange, instead
+    of 40 separate attributes.
+
+    Level attributes (bid_price_1, ask_volume_10...) and datetime are
+    read-only properties calculated on access, so existing consumers
+    keep working. Every depth message creates a new object owning its
+    own lists, so it is an immutable snapshot and needs no copy before
+    being pushed.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        gateway_name: str,
+        bids: list,
+        asks: list,
+        timestamp: float,
+        name: str = "",
+        volume: float = 0,
+        last_price: float = 0,
+        last_volume: float = 0,
+        open_price: float = 0,
+        high_price: float = 0,
+        low_price: float = 0,
+    ):
+        """
+        timestamp is exchange time in milliseconds.
+        """
+        self.gateway_name = gateway_name
+        self.symbol = symbol
+        self.exchange = exchange
+        self.bids = bids
+        self.asks = asks
+        self.timestamp = timestamp
+        self._datetime = None
+
+        self.name = name
+        self.volume = volume
+        self.last_price = last_price
+        self.last_volume = last_volume
+        self.open_price = open_price
+        self.high_price = high_price
+        self.low_price = low_price
+
+        self.vt_symbol = f"{symbol}.{exchange.value}"
+
+    @property
+    def datetime(self):
+        """"""
+        if not self._datetime:
+            self._datetime = datetime.fromtimestamp(self.timestamp / 1000)
+        return self._datetime
+
+
+def _depth_level_property(side: str, ix: int):
+    """
+    Create property reading a value from flat level list of a side.
+    """
+    def get_value(self):
+        levels = getattr(self, side)
+        if ix < len(levels):
+            return levels[ix]
+        return 0
+    return property(get_value)
+
+
+for _n in range(10):
+    setattr(DepthTickData, f"bid_price_{_n + 1}", _depth_level_property("bids", _n * 2))
+    setattr(DepthTickData, f"bid_volume_{_n + 1}", _depth_level_property("bids", _n * 2 + 1))
+    setattr(DepthTickData, f"ask_price_{_n + 1}", _depth_level_property("asks", _n * 2))
+    setattr(DepthTickData, f"ask_volume_{_n + 1}", _depth_level_property("asks", _n * 2 + 1))
+del _n
+
+
 @dataclass
 class BarData(BaseData):
     """
@@ -0,0 +1,258 @@
+"""
+Order book keeping all depth levels in price-sorted NumPy arrays.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from .constant import Exchange
+
+EMPTY_LEVELS = np.zeros((0, 2))
+
+
+class OrderBook:
+    """
+    Order book of a symbol with all levels provided by market data feed.
+
+    Each side is read as an (n, 2) array of [price, volume] rows,
+    bids sorted by price descending and asks ascending, so best price
+    is always the first row. Every update replaces the whole data of
+    a side, so readers in other threads always see a consistent side
+    if they take a local reference first.
+
+    Snapshot lists are only converted into arrays when a side is
+    first read after update, so updates nobody reads cost nothing.
+
+    Cost of reads:
+    * best_bid / best_ask: O(1), top of book is kept on update
+    * bids / asks and level reads: O(n) on first read after update
+      (conversion into array), then O(1)
+    * volume at price and cumulative volume: O(log n) binary search,
+      plus O(n) once after update for search keys and sums
+    """
+
+    def __init__(self, symbol: str, exchange: Exchange, gateway_name: str):
+        """"""
+        self.symbol = symbol
+        self.exchange = exchange
+        self.gateway_name = gateway_name
+        self.vt_symbol = f"{symbol}.{exchange.value}"
+
+        # Exchange time in milliseconds, converted to datetime on read.
+        self.timestamp = 0
+        self._datetime: datetime = None
+
+        # Best price of each side, kept on update.
+        self._best_bid = 0
+        self._best_ask = 0
+
+        # Levels as updated, either flat list or array.
+        self._bid_levels = EMPTY_LEVELS
+        self._ask_levels = EMPTY_LEVELS
+
+        # (levels, array) converted on first read after update.
+        self._bid_array = (None, None)
+        self._ask_array = (None, None)
+
+        # (array, cumulative volumes), calculated on first query
+        # after levels updated.
+        self._bid_cumsum = (None, None)
+        self._ask_cumsum = (None, None)
+
+        # (array, contiguous search keys) for binary search by price,
+        # bid prices are negated so keys are ascending on both sides.
+        self._bid_keys = (None, None)
+        self._ask_keys = (None, None)
+
+    @property
+    def bids(self):
+        """
+        Bid levels array, sorted by price descending.
+        """
+        levels = self._bid_levels
+        cached, array = self._bid_array
+        if cached is not levels:
+            array = np.asarray(levels, dtype=float).reshape(-1, 2)
+            self._bid_array = (levels, array)
+        return array
+
+    @property
+    def asks(self):
+        """
+        Ask levels array, sorted by price ascending.
+        """
+        levels = self._ask_levels
+        cached, array = self._ask_array
+        if cached is not levels:
+            array = np.asarray(levels, dtype=float).reshape(-1, 2)
+            self._ask_array = (levels, array)
+        return array
+
+    @property
+    def datetime(self):
+        """
+        Time of last update, from dt or timestamp given to update.
+        """
+        if not self._datetime and self.timestamp:
+            self._datetime = datetime.fromtimestamp(self.timestamp / 1000)
+        return self._datetime
+
+    def update_snapshot(
+        self, bids: list, asks: list, dt: datetime = None, timestamp: float = 0
+    ):
+        """
+        Replace all levels with snapshot in [price, volume, price, volume...]
+        format, which is used by FMEX depth topics.
+        """
+        self._bid_levels = bids
+        self._ask_levels = asks
+        self._best_bid = bids[0] if len(bids) else 0
+        self._best_ask = asks[0] if len(asks) else 0
+        self._update_time(dt, timestamp)
+
+    def update_delta(
+        self, bids: list, asks: list, dt: datetime = None, timestamp: float = 0
+    ):
+        """
+        Apply incremental level changes in [price, volume...] format,
+        a level with zero volume is removed.
+        """
+        if len(bids):
+            levels = merge_levels(self.bids, bids, True)
+            self._bid_levels = levels
+            self._best_bid = levels[0, 0] if len(levels) else 0
+
+        if len(asks):
+            levels = merge_levels(self.asks, asks, False)
+            self._ask_levels = levels
+            self._best_ask = levels[0, 0] if len(levels) else 0
+
+        self._update_time(dt, timestamp)
+
+    def _update_time(self, dt: datetime, timestamp: float):
+        """
+        Keep time of last update if neither dt nor timestamp is given.
+        """
+        if dt or timestamp:
+            self._datetime = dt
+            self.timestamp = timestamp
+
+    def clear(self):
+        """
+        Remove all levels, e.g. when market data becomes stale.
+        """
+        self._bid_levels = EMPTY_LEVELS
+        self._ask_levels = EMPTY_LEVELS
+        self._best_bid = 0
+        self._best_ask = 0
+
+    @property
+    def best_bid(self):
+        """"""
+        return self._best_bid
+
+    @property
+    def best_ask(self):
+        """"""
+        return self._best_ask
+
+    def get_bid_level(self, level: int):
+        """
+        Get (price, volume) of bid level, starting from 0.
+        """
+        bids = self.bids
+        if level < len(bids):
+            return bids[level, 0], bids[level, 1]
+        return 0, 0
+
+    def get_ask_level(self, level: int):
+        """
+        Get (price, volume) of ask level, starting from 0.
+        """
+        asks = self.asks
+        if level < len(asks):
+            return asks[level, 0], asks[level, 1]
+        return 0, 0
+
+    def _get_bid_keys(self, bids: np.ndarray):
+        """"""
+        levels, keys = self._bid_keys
+        if levels is not bids:
+            keys = -bids[:, 0]
+            self._bid_keys = (bids, keys)
+        return keys
+
+    def _get_ask_keys(self, asks: np.ndarray):
+        """"""
+        levels, keys = self._ask_keys
+        if levels is not asks:
+            keys = np.ascontiguousarray(asks[:, 0])
+            self._ask_keys = (asks, keys)
+        return keys
+
+    def get_bid_volume(self, price: float):
+        """
+        Get bid volume at price.
+        """
+        bids = self.bids
+        ix = np.searchsorted(self._get_bid_keys(bids), -price)
+        if ix < len(bids) and bids[ix, 0] == price:
+            return bids[ix, 1]
+        return 0
+
+    def get_ask_volume(self, price: float):
+        """
+        Get ask volume at price.
+        """
+        asks = self.asks
+        ix = np.searchsorted(self._get_ask_keys(asks), price)
+        if ix < len(asks) and asks[ix, 0] == price:
+            return asks[ix, 1]
+        return 0
+
+    def get_cumulative_bid_volume(self, price: float):
+        """
+        Get total bid volume of levels with price higher than or equal
+        to price.
+        """
+        bids = self.bids
+        levels, cumsum = self._bid_cumsum
+        if levels is not bids:
+            cumsum = np.cumsum(bids[:, 1])
+            self._bid_cumsum = (bids, cumsum)
+
+        count = np.searchsorted(self._get_bid_keys(bids), -price, side="right")
+        return cumsum[count - 1] if count else 0
+
+    def get_cumulative_ask_volume(self, price: float):
+        """
+        Get total ask volume of levels with price lower than or equal
+        to price.
+        """
+        asks = self.asks
+        levels, cumsum = self._ask_cumsum
+        if levels is not asks:
+            cumsum = np.cumsum(asks[:, 1])
+            self._ask_cumsum = (asks, cumsum)
+
+        count = np.searchsorted(self._get_ask_keys(asks), price, side="right")
+        return cumsum[count - 1] if count else 0
+
+
+def merge_levels(levels: np.ndarray, update: list, descending: bool):
+    """
+    Merge level changes into price-sorted levels, changes take priority
+    over existing levels of the same price.
+    """
+    update = np.asarray(update, dtype=float).reshape(-1, 2)
+    merged = np.concatenate((update, levels))
+
+    # np.unique returns first occurrence, which is from update.
+    prices, ix = np.unique(merged[:, 0], return_index=True)
+    merged = merged[ix]
+    merged = merged[merged[:, 1] > 0]
+
+    if descending:
+        merged = merged[::-1]
+    return np.ascontiguousarray(merged)
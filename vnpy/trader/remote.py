@@ -0,0 +1,256 @@
+"""
+Run a gateway in a separate process, connected to main process by
+shared memory ring buffers.
+"""
+
+import multiprocessing
+import pickle
+import sys
+import traceback
+from threading import Lock, Thread
+from time import sleep
+from typing import Type
+
+from vnpy.event import Event, EventEngine, EVENT_TIMER, EVENT_PROFILE
+from vnpy.event.ring import SharedRingBuffer
+from .gateway import BaseGateway
+from .object import (
+    OrderRequest,
+    CancelRequest,
+    SubscribeRequest,
+    HistoryRequest
+)
+
+# Events generated locally in each process are not forwarded.
+LOCAL_EVENT_TYPES = set([EVENT_TIMER, EVENT_PROFILE])
+
+
+class RingPublisher:
+    """
+    Publish events into ring buffer, used as general handler of event
+    engine in gateway process.
+    """
+
+    def __init__(self, ring: SharedRingBuffer):
+        """"""
+        self.ring = ring
+        self.dropped_count = 0
+
+    def publish(self, event: Event):
+        """"""
+        if event.type in LOCAL_EVENT_TYPES:
+            return
+
+        data = pickle.dumps(
+            (event.type, event.data, event.topic), pickle.HIGHEST_PROTOCOL
+        )
+
+        # Wait a short time for main process to catch up if full.
+        for i in range(1000):
+            if self.ring.put(data):
+                return
+            sleep(0.001)
+
+        self.dropped_count += 1
+
+
+def run_gateway_process(
+    gateway_class: Type[BaseGateway],
+    setting: dict,
+    event_ring_name: str,
+    request_ring_name: str
+):
+    """
+    Entry of gateway process: connect gateway, publish its events and
+    execute requests sent from main process until closed.
+    """
+    event_ring = SharedRingBuffer(event_ring_name)
+    request_ring = SharedRingBuffer(request_ring_name)
+
+    event_engine = EventEngine()
+    publisher = RingPublisher(event_ring)
+    event_engine.register_general(publisher.publish)
+    event_engine.start()
+
+    gateway = gateway_class(event_engine)
+    gateway.connect(setting)
+
+    while True:
+        data = request_ring.wait_get()
+        if data is None:
+            continue
+
+        method, req = pickle.loads(data)
+        if method == "close":
+            break
+
+        try:
+            if req is None:
+                getattr(gateway, method)()
+            else:
+                getattr(gateway, method)(req)
+        except Exception:
+            traceback.print_exc()
+
+    gateway.close()
+    event_engine.stop()
+
+    event_ring.close()
+    request_ring.close()
+
+
+class RemoteGateway(BaseGateway):
+    """
+    Proxy of a gateway running in a separate process.
+
+    Websocket decoding and REST callbacks of the gateway run in
+    gateway process, which publishes its events into a shared memory
+    ring buffer. A bridge thread in main process puts them into event
+    engine as normal events, and requests are sent back through
+    another ring buffer.
+
+    Use create_remote_gateway to create proxy class of a gateway, and
+    add it into main engine instead of the gateway class.
+
+    Since orders are sent asynchronously, send_order returns empty
+    string, and the order is pushed by on_order of gateway.
+    """
+
+    gateway_class = None
+    default_gateway_name = ""
+
+    event_ring_size = 16 * 1024 * 1024
+    request_ring_size = 1024 * 1024
+
+    def __init__(self, event_engine: EventEngine, gateway_name: str = ""):
+        """"""
+        super(RemoteGateway, self).__init__(
+            event_engine, gateway_name or self.default_gateway_name
+        )
+
+        self.event_ring = None
+        self.request_ring = None
+        self.request_lock = Lock()
+
+        self.process = None
+        self.thread = None
+        self.active = False
+
+    def connect(self, setting: dict):
+        """
+        Start gateway process and bridge thread.
+        """
+        if self.active:
+            return
+
+        self.event_ring = SharedRingBuffer(size=self.event_ring_size, create=True)
+        self.request_ring = SharedRingBuffer(size=self.request_ring_size, create=True)
+
+        # Spawn a clean process since main process has threads running.
+        context = multiprocessing.get_context("spawn")
+        self.process = context.Process(
+            target=run_gateway_process,
+            args=(
+                self.gateway_class,
+                setting,
+                self.event_ring.name,
+                self.request_ring.name
+            ),
+            daemon=True
+        )
+        self.process.start()
+
+        self.active = True
+        self.thread = Thread(target=self.run)
+        self.thread.start()
+
+        self.write_log(f"接口进程启动成功：{self.process.pid}")
+
+    def run(self):
+        """
+        Re-inject events published by gateway process into event engine.
+        """
+        while self.active:
+            data = self.event_ring.wait_get()
+            if data is None:
+                continue
+
+            try:
+                type, event_data, topic = pickle.loads(data)
+                self.event_engine.put(Event(type, event_data, topic))
+            except Exception:
+                sys.stderr.write(traceback.format_exc())
+
+    def send_request(self, method: str, req=None):
+        """
+        Send a request to gateway process.
+        """
+        if not self.active:
+            return
+
+        data = pickle.dumps((method, req), pickle.HIGHEST_PROTOCOL)
+
+        with self.request_lock:
+            while not self.request_ring.put(data):
+                sleep(0.001)
+
+    def close(self):
+        """
+        Close gateway process and bridge thread.
+        """
+        if not self.active:
+            return
+
+        self.send_request("close")
+        self.process.join(10)
+
+        self.active = False
+        self.thread.join()
+
+        self.event_ring.close()
+        self.request_ring.close()
+
+    def subscribe(self, req: SubscribeRequest):
+        """"""
+        self.send_request("subscribe", req)
+
+    def send_order(self, req: OrderRequest):
+        """"""
+        self.send_request("send_order", req)
+        return ""
+
+    def cancel_order(self, req: CancelRequest):
+        """"""
+        self.send_request("cancel_order", req)
+
+    def query_account(self):
+        """"""
+        self.send_request("query_account")
+
+    def query_position(self):
+        """"""
+        self.send_request("query_position")
+
+    def query_history(self, req: HistoryRequest):
+        """
+        History query needs return value, not supported remotely.
+        """
+        return None
+
+
+def create_remote_gateway(gateway_class: Type[BaseGateway], gateway_name: str):
+    """
+    Create a RemoteGateway class running gateway_class in a separate
+    process, which can be added into main engine by add_gateway.
+    """
+    remote_class = type(
+        f"Remote{gateway_class.__name__}",
+        (RemoteGateway,),
+        {
+            "gateway_class": gateway_class,
+            "default_gateway_name": gateway_name,
+            "default_setting": gateway_class.default_setting,
+            "exchanges": gateway_class.exchanges,
+        }
+    )
+    return remote_class
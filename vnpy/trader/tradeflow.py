@@ -0,0 +1,190 @@
+"""
+Rolling aggregation of tick-by-tick market trades.
+"""
+
+from threading import Lock
+from time import monotonic
+
+from .constant import Direction, Exchange
+
+
+class TradeAggregator:
+    """
+    Market trades of a symbol within a rolling time window.
+
+    Trades are kept in a fixed size ring buffer and running sums are
+    updated as trades enter and leave the window, so all statistics
+    are O(1) lookups. The window is shortened if more than size trades
+    happen within it.
+
+    Timestamps are exchange time in milliseconds. The window moves on
+    every update, and on advance (called periodically by gateway) by
+    exchange time estimated from last trade, so local clock offset
+    does not matter. All methods are thread-safe.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        gateway_name: str,
+        window: float = 60,
+        size: int = 4096,
+    ):
+        """
+        window is length of rolling window in seconds.
+        """
+        self.symbol = symbol
+        self.exchange = exchange
+        self.gateway_name = gateway_name
+        self.vt_symbol = f"{symbol}.{exchange.value}"
+
+        self.window = window
+        self.size = size
+
+        self.ts = [0] * size
+        self.prices = [0.0] * size
+        self.volumes = [0.0] * size         # Positive buy, negative sell
+
+        # Total number of trades added and removed, buffer index is
+        # count modulo size.
+        self.head = 0
+        self.tail = 0
+
+        self.lock = Lock()
+
+        self.last_ts = 0
+        self.last_local = 0         # Local monotonic time of last trade
+        self.last_price = 0
+        self.last_volume = 0
+
+        self.turnover = 0
+        self.buy_volume = 0
+        self.sell_volume = 0
+
+    def update(self, ts: float, price: float, volume: float, direction: Direction):
+        """
+        Add a market trade, direction is taker side.
+        """
+        with self.lock:
+            self._update(ts, price, volume, direction)
+
+    def _update(self, ts: float, price: float, volume: float, direction: Direction):
+        """"""
+        if self.head - self.tail == self.size:
+            self._pop()
+
+        ix = self.head % self.size
+        self.head += 1
+
+        self.ts[ix] = ts
+        self.prices[ix] = price
+        if direction == Direction.SHORT:
+            self.volumes[ix] = -volume
+            self.sell_volume += volume
+        else:
+            self.volumes[ix] = volume
+            self.buy_volume += volume
+        self.turnover += price * volume
+
+        self.last_ts = ts
+        self.last_local = monotonic()
+        self.last_price = price
+        self.last_volume = volume
+
+        self._expire(ts)
+
+    def expire(self, ts: float):
+        """
+        Remove trades older than window before exchange time ts.
+        """
+        with self.lock:
+            self._expire(ts)
+
+    def advance(self):
+        """
+        Move window to current exchange time, estimated from time
+        passed since last trade.
+        """
+        with self.lock:
+            if self.last_ts:
+                elapsed = monotonic() - self.last_local
+                self._expire(self.last_ts + elapsed * 1000)
+
+    def _expire(self, ts: float):
+        """"""
+        start = ts - self.window * 1000
+        while self.tail < self.head and self.ts[self.tail % self.size] < start:
+            self._pop()
+
+    def _pop(self):
+        """"""
+        ix = self.tail % self.size
+        self.tail += 1
+
+        volume = self.volumes[ix]
+        if volume < 0:
+            self.sell_volume += volume
+            self.turnover += self.prices[ix] * volume
+        else:
+            self.buy_volume -= volume
+            self.turnover -= self.prices[ix] * volume
+
+        # Clear rounding errors left by running sums.
+        if self.tail == self.head:
+            self.turnover = 0
+            self.buy_volume = 0
+            self.sell_volume = 0
+
+    @property
+    def count(self):
+        """
+        Number of trades in window.
+        """
+        return self.head - self.tail
+
+    @property
+    def volume(self):
+        """"""
+        with self.lock:
+            return self.buy_volume + self.sell_volume
+
+    @property
+    def signed_volume(self):
+        """
+        Taker buy volume minus taker sell volume.
+        """
+        with self.lock:
+            return self.buy_volume - self.sell_volume
+
+    @property
+    def vwap(self):
+        """"""
+        with self.lock:
+            volume = self.buy_volume + self.sell_volume
+            if volume <= 0:
+                return 0
+            return self.turnover / volume
+
+    @property
+    def trade_rate(self):
+        """
+        Trades per second in window.
+        """
+        return (self.head - self.tail) / self.window
+
+    def get_trades(self, n: int = 0):
+        """
+        Get last n trades (all trades in window if n is 0) as list of
+        (ts, price, signed volume), oldest first.
+        """
+        with self.lock:
+            count = self.head - self.tail
+            if n and n < count:
+                count = n
+
+            trades = []
+            for i in range(self.head - count, self.head):
+                ix = i % self.size
+                trades.append((self.ts[ix], self.prices[ix], self.volumes[ix]))
+            return trades
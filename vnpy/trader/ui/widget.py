@@ -9,7 +9,7 @@ from copy import copy
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
-from vnpy.event import Event, EventEngine
+from vnpy.event import Event, EventEngine, LANE_BACKGROUND
 from ..constant import Direction, Exchange, Offset, OrderType
 from ..engine import MainEngine
 from ..event import (
@@ -242,7 +242,9 @@ class BaseMonitor(QtWidgets.QTableWidget):
         """
         if self.event_type:
             self.signal.connect(self.process_event)
-            self.event_engine.register(self.event_type, self.signal.emit)
+            self.event_engine.register(
+                self.event_type, self.signal.emit, LANE_BACKGROUND
+            )
 
     def process_event(self, event):
         """
@@ -714,7 +716,9 @@ class TradingWidget(QtWidgets.QWidget):
     def register_event(self):
         """"""
         self.signal_tick.connect(self.process_tick_event)
-        self.event_engine.register(EVENT_TICK, self.signal_tick.emit)
+        self.event_engine.register(
+            EVENT_TICK, self.signal_tick.emit, LANE_BACKGROUND
+        )
 
     def process_tick_event(self, event: Event):
         """"""